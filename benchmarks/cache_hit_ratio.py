@@ -0,0 +1,116 @@
+"""Throughput of `Cache.get` with and without the in-process layer at different hit ratios.
+
+Redis is replaced by an in-memory stand-in with a simulated round trip, so the
+numbers isolate what the local layer saves: the network hop and JSON decoding.
+
+    python -m benchmarks.cache_hit_ratio --rtt-ms 0.5
+"""
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+
+from benchmarks.fakes import FakeRedis, FakeRedisServer, wait_for
+from stormwater_api.cache import Cache, LocalCache
+from stormwater_api.config import settings
+
+TEST_CASE = Path(__file__).parent.parent / "tests" / "test_cases" / "test_case_1.json"
+HOT_KEYS = [f"hot_{i}" for i in range(12)]
+
+
+class SlowFakeRedis(FakeRedis):
+    def __init__(self, server: FakeRedisServer, rtt_seconds: float):
+        super().__init__(server)
+        self._rtt_seconds = rtt_seconds
+
+    def get(self, key: str):
+        time.sleep(self._rtt_seconds)
+        return super().get(key)
+
+
+def make_cache(server: FakeRedisServer, rtt_seconds: float, local: bool) -> Cache:
+    import stormwater_api.cache
+
+    original_redis = stormwater_api.cache.redis.Redis
+    stormwater_api.cache.redis.Redis = lambda **kwargs: SlowFakeRedis(
+        server, rtt_seconds
+    )
+    try:
+        cache = Cache(
+            connection_config=settings.cache.connection,
+            key_prefix="bench",
+            ttl_days=1,
+            local_cache=LocalCache(
+                max_bytes=settings.cache.local.max_bytes,
+                ttl_seconds=settings.cache.local.ttl_seconds,
+            )
+            if local
+            else None,
+        )
+    finally:
+        stormwater_api.cache.redis.Redis = original_redis
+
+    if local:
+        cache.start_invalidation_listener()
+        wait_for(lambda: cache.stats()["local_cache_enabled"])
+    return cache
+
+
+def run(cache: Cache, hit_ratio: float, requests: int, seed: int) -> float:
+    rng = random.Random(seed)
+    for key in HOT_KEYS:
+        cache.get(key=key)
+
+    start = time.perf_counter()
+    for i in range(requests):
+        key = rng.choice(HOT_KEYS) if rng.random() < hit_ratio else f"cold_{i}"
+        cache.get(key=key)
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rtt-ms", type=float, default=0.5)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument(
+        "--hit-ratios", type=float, nargs="+", default=[0.0, 0.5, 0.9, 0.99]
+    )
+    args = parser.parse_args()
+
+    with open(TEST_CASE) as file:
+        serialized_result = json.dumps(json.load(file)["response"])
+
+    server = FakeRedisServer()
+    # Cold keys all resolve to the same payload so the stand-in stays small.
+    server.data = _AnyKey(serialized_result)
+
+    print(f"payload: {len(serialized_result)} bytes, rtt: {args.rtt_ms} ms")
+    print(f"{'hit ratio':>10} {'redis only (req/s)':>20} {'two-level (req/s)':>20}")
+    for hit_ratio in args.hit_ratios:
+        redis_only = run(
+            make_cache(server, args.rtt_ms / 1000, local=False),
+            hit_ratio,
+            args.requests,
+            seed=1,
+        )
+        two_level = run(
+            make_cache(server, args.rtt_ms / 1000, local=True),
+            hit_ratio,
+            args.requests,
+            seed=1,
+        )
+        print(f"{hit_ratio:>10.2f} {redis_only:>20.0f} {two_level:>20.0f}")
+
+
+class _AnyKey(dict):
+    def __init__(self, value: str):
+        super().__init__()
+        self._value = value
+
+    def get(self, key, default=None):
+        return super().get(key, (self._value, None))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""In-memory Redis stand-ins shared by the benchmarks and the tests."""
+import queue
+import threading
+import time
+from typing import Optional
+
+
+class FakeRedisServer:
+    """Shared state for FakeRedis clients, standing in for a single Redis instance."""
+
+    def __init__(self):
+        self.data: dict[str, tuple[str, Optional[float]]] = {}
+        self.subscribers: dict[str, list[queue.Queue]] = {}
+        self.lock = threading.Lock()
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of `redis.Redis` used by the API."""
+
+    def __init__(self, server: Optional[FakeRedisServer] = None, **kwargs):
+        self.server = server or FakeRedisServer()
+
+    def get(self, key: str) -> Optional[str]:
+        with self.server.lock:
+            item = self.server.data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.time():
+                del self.server.data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self.server.lock:
+            self.server.data[key] = (value, None)
+
+    def setex(self, key: str, ttl: int, value: str) -> None:
+        with self.server.lock:
+            self.server.data[key] = (value, time.time() + ttl)
+
+    def delete(self, key: str) -> None:
+        with self.server.lock:
+            self.server.data.pop(key, None)
+
+    def lpush(self, key: str, value: str) -> None:
+        with self.server.lock:
+            values, _ = self.server.data.setdefault(key, ([], None))
+            values.insert(0, value)
+
+    def ltrim(self, key: str, start: int, end: int) -> None:
+        with self.server.lock:
+            if key in self.server.data:
+                values, expires_at = self.server.data[key]
+                stop = None if end == -1 else end + 1
+                self.server.data[key] = (values[start:stop], expires_at)
+
+    def lrange(self, key: str, start: int, end: int) -> list[str]:
+        with self.server.lock:
+            values, _ = self.server.data.get(key, ([], None))
+            stop = None if end == -1 else end + 1
+            return values[start:stop]
+
+    def publish(self, channel: str, message: str) -> None:
+        with self.server.lock:
+            subscribers = list(self.server.subscribers.get(channel, []))
+        for subscriber in subscribers:
+            subscriber.put({"type": "message", "channel": channel, "data": message})
+
+    def pubsub(self, **kwargs) -> "FakePubSub":
+        return FakePubSub(self.server)
+
+
+class FakePubSub:
+    def __init__(self, server: FakeRedisServer):
+        self._server = server
+        self._messages: queue.Queue = queue.Queue()
+        self._channels: list[str] = []
+
+    def subscribe(self, *channels: str) -> None:
+        with self._server.lock:
+            for channel in channels:
+                self._server.subscribers.setdefault(channel, []).append(self._messages)
+                self._channels.append(channel)
+
+    def listen(self):
+        while True:
+            yield self._messages.get()
+
+    def close(self) -> None:
+        with self._server.lock:
+            for channel in self._channels:
+                self._server.subscribers[channel].remove(self._messages)
+        self._channels = []
+
+
+def wait_for(condition, timeout: float = 2) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
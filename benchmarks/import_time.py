@@ -0,0 +1,55 @@
+"""Import time and resident memory of the API and worker entrypoints.
+
+Each module is imported in a fresh interpreter with `python -X importtime`,
+reporting the cumulative import time, the peak RSS and the slowest imports.
+
+    python -m benchmarks.import_time
+"""
+import argparse
+import subprocess
+import sys
+
+ENTRYPOINTS = ["stormwater_api.api.main", "stormwater_api.tasks"]
+
+PROBE = """
+import resource
+import {module}
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def measure(module: str) -> tuple[int, int, list[tuple[int, str]]]:
+    """Return the cumulative import time (us), peak RSS (KiB) and per-package import times of `module`."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        imports.append((int(cumulative), name.strip()))
+
+    total = next(us for us, name in imports if name == module)
+    max_rss_kib = int(completed.stdout.strip().splitlines()[-1])
+    return total, max_rss_kib, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    for module in ENTRYPOINTS:
+        total, max_rss_kib, imports = measure(module)
+        print(f"{module}: {total / 1000:.0f} ms, {max_rss_kib / 1024:.1f} MiB max RSS")
+        top_level = [(us, name) for us, name in imports if "." not in name]
+        for us, name in sorted(top_level, reverse=True)[: args.top]:
+            print(f"    {us / 1000:8.0f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""End-to-end load test of the API, Celery and Redis with a stub solver.
+
+By default the whole stack runs in this process: the API behind an ASGI
+transport, a Celery worker thread on an in-memory broker and an in-memory
+Redis stand-in, with `StubScenarioProcessor` in place of SWMM. With `--url`
+a running stack is targeted instead; start its workers with
+`SCENARIO_PROCESSOR=benchmarks.stub_processor.StubScenarioProcessor`.
+
+Virtual users submit a mix of cache hits (scenarios that already have a
+result), duplicates (scenarios still being computed) and misses (new
+scenarios), poll the status until the job finishes and fetch the results.
+
+    python -m benchmarks.load_test --scenarios 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import contextlib
+import copy
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import httpx
+
+REPO_DIR = Path(__file__).parent.parent
+TEST_CASE = REPO_DIR / "tests" / "test_cases" / "test_case_1.json"
+API_PREFIX = "/stormwater"
+
+BASELINE_VARIANTS = [
+    {"return_period": return_period, "flow_path": flow_path, "roofs": roofs}
+    for return_period in [2, 10, 100]
+    for flow_path in ["blockToStreet", "blockToPark"]
+    for roofs in ["extensive", "intensive"]
+]
+
+IN_PROCESS_ENVIRONMENT = {
+    "APP_TITLE": "Stormwater API",
+    "APP_DESCRIPTION": "Load test",
+    "APP_VERSION": "0.0.0",
+    "DEBUG": "false",
+    "ENVIRONMENT": "LOCALDEV",
+    "LOG_LEVEL": "INFO",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "REDIS_DB": "0",
+    "REDIS_USERNAME": "",
+    "REDIS_PASSWORD": "",
+    "REDIS_SSL": "false",
+}
+
+
+class Workload:
+    """Chooses what each virtual user submits next."""
+
+    def __init__(
+        self,
+        template: dict,
+        subcatchment_ids: list[str],
+        hit_ratio: float,
+        duplicate_ratio: float,
+        seed: int,
+    ):
+        self._template = template
+        self._subcatchment_ids = subcatchment_ids
+        self._hit_ratio = hit_ratio
+        self._duplicate_ratio = duplicate_ratio
+        self._rng = random.Random(seed)
+        self._seen: set[str] = set()
+        self._baselines = list(BASELINE_VARIANTS)
+        self.completed: list[dict] = []
+        self.in_flight: list[dict] = []
+
+    def next(self) -> tuple[str, dict]:
+        draw = self._rng.random()
+        if draw < self._hit_ratio and self.completed:
+            return "hit", self._rng.choice(self.completed)
+        if draw < self._hit_ratio + self._duplicate_ratio and self.in_flight:
+            return "duplicate", self._rng.choice(self.in_flight)
+        return "miss", self._new_scenario()
+
+    def _new_scenario(self) -> dict:
+        payload = copy.copy(self._template)
+        # The hot baseline variants come first, then scenarios with updates.
+        if self._baselines:
+            payload.update(self._baselines.pop(0), model_updates=None)
+            return payload
+
+        while True:
+            variant = self._rng.choice(BASELINE_VARIANTS)
+            subcatchments = self._rng.sample(self._subcatchment_ids, 3)
+            key = json.dumps([variant, sorted(subcatchments)], sort_keys=True)
+            if key not in self._seen:
+                self._seen.add(key)
+                break
+        payload.update(
+            variant,
+            model_updates=[
+                {"subcatchment_id": subcatchment_id, "outlet_id": "outfall1"}
+                for subcatchment_id in subcatchments
+            ],
+        )
+        return payload
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.requests = 0
+
+    @contextlib.asynccontextmanager
+    async def timed(self, name: str) -> AsyncIterator[None]:
+        start = time.perf_counter()
+        yield
+        self.latencies.setdefault(name, []).append(time.perf_counter() - start)
+
+    async def request(
+        self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs
+    ) -> dict:
+        async with self.timed(name):
+            response = await client.request(method, url, **kwargs)
+        self.requests += 1
+        response.raise_for_status()
+        return response.json()
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    workload: Workload,
+    poll_interval: float,
+) -> None:
+    kind, payload = workload.next()
+    async with recorder.timed(f"scenario ({kind})"):
+        submitted = await recorder.request(
+            client,
+            "submit",
+            "POST",
+            f"{API_PREFIX}/processes/runoff/execution",
+            json=payload,
+        )
+        if kind == "miss":
+            workload.in_flight.append(payload)
+
+        job_id = submitted["job_id"]
+        while True:
+            status = await recorder.request(
+                client, "status", "GET", f"{API_PREFIX}/jobs/{job_id}/status"
+            )
+            if status["status"] in ("SUCCESS", "FAILURE"):
+                break
+            await asyncio.sleep(poll_interval)
+
+        await recorder.request(
+            client, "results", "GET", f"{API_PREFIX}/jobs/{job_id}/results"
+        )
+
+    if kind == "miss":
+        workload.in_flight.remove(payload)
+        workload.completed.append(payload)
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    scenarios: int,
+    concurrency: int,
+    poll_interval: float,
+) -> dict:
+    recorder = Recorder()
+    remaining = iter(range(scenarios))
+
+    async def virtual_user():
+        for _ in remaining:
+            await run_scenario(client, recorder, workload, poll_interval)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(virtual_user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "elapsed_seconds": elapsed,
+        "requests_per_second": recorder.requests / elapsed,
+        "scenarios_per_second": scenarios / elapsed,
+        "latency_ms": {
+            name: latency_summary(values)
+            for name, values in sorted(recorder.latencies.items())
+        },
+    }
+
+
+def latency_summary(values: list[float]) -> dict:
+    ordered = sorted(values)
+
+    def percentile(p: float) -> float:
+        return 1000 * ordered[round(p * (len(ordered) - 1))]
+
+    return {
+        "count": len(ordered),
+        "p50": percentile(0.5),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": 1000 * ordered[-1],
+    }
+
+
+@contextlib.contextmanager
+def in_process_stack(service_time: float, jitter: float, worker_concurrency: int):
+    for name, value in IN_PROCESS_ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
+    os.environ["SCENARIO_PROCESSOR"] = "benchmarks.stub_processor.StubScenarioProcessor"
+    os.environ["STUB_SERVICE_TIME_SECONDS"] = str(service_time)
+    os.environ["STUB_SERVICE_TIME_JITTER_SECONDS"] = str(jitter)
+    # Celery prefers these over the broker and backend configured below.
+    os.environ.pop("CELERY_BROKER_URL", None)
+    os.environ.pop("CELERY_RESULT_BACKEND", None)
+
+    # Every Redis client the stack creates must talk to the stand-in, so
+    # it has to be swapped in before stormwater_api is imported.
+    import redis
+
+    from benchmarks.fakes import FakeRedis, FakeRedisServer
+
+    server = FakeRedisServer()
+    redis.Redis = lambda **kwargs: FakeRedis(server)
+
+    from celery.contrib.testing.worker import start_worker
+
+    from stormwater_api.config import settings
+    from stormwater_api.dependencies import cache, celery_app
+
+    celery_app.conf.update(
+        broker_url="memory://",
+        broker_transport_options={"polling_interval": 0.01},
+        result_backend="cache+memory://",
+    )
+
+    import stormwater_api.tasks  # noqa: F401 registers the tasks
+    from stormwater_api.api.main import app
+
+    cache.start_invalidation_listener()
+    queues = [
+        settings.broker.task_default_queue,
+        settings.routing.fast_queue,
+        settings.routing.slow_queue,
+    ]
+    with start_worker(
+        celery_app,
+        concurrency=worker_concurrency,
+        pool="threads",
+        perform_ping_check=False,
+        queues=queues,
+    ):
+        yield httpx.ASGITransport(app=app), "http://stormwater"
+
+
+def load_subcatchment_ids() -> list[str]:
+    from stormwater_api import inp
+    from stormwater_api.config import INPUT_DIR
+
+    sections = inp.read_sections(INPUT_DIR / "blockToPark_extensive_2.inp")
+    return inp.element_ids(sections, "SUBCATCHMENTS")
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"{report['elapsed_seconds']:.1f}s, "
+        f"{report['requests_per_second']:.1f} requests/s, "
+        f"{report['scenarios_per_second']:.1f} scenarios/s"
+    )
+    print(
+        f"{'latency (ms)':<20} {'count':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    )
+    for name, summary in report["latency_ms"].items():
+        print(
+            f"{name:<20} {summary['count']:>6} {summary['p50']:>8.1f} "
+            f"{summary['p95']:>8.1f} {summary['p99']:>8.1f} {summary['max']:>8.1f}"
+        )
+
+
+async def main_async(args: argparse.Namespace, url: Optional[str]) -> dict:
+    with open(TEST_CASE) as file:
+        template = json.load(file)["request"]
+
+    async def run(client: httpx.AsyncClient) -> dict:
+        workload = Workload(
+            template,
+            load_subcatchment_ids(),
+            hit_ratio=args.hit_ratio,
+            duplicate_ratio=args.duplicate_ratio,
+            seed=args.seed,
+        )
+        return await run_load(
+            client, workload, args.scenarios, args.concurrency, args.poll_interval
+        )
+
+    if url is not None:
+        async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+            return await run(client)
+
+    with in_process_stack(args.service_time, args.jitter, args.worker_concurrency) as (
+        transport,
+        base_url,
+    ):
+        async with httpx.AsyncClient(
+            transport=transport, base_url=base_url, timeout=60
+        ) as client:
+            return await run(client)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--url", help="base URL of a running stack")
+    parser.add_argument("--scenarios", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--hit-ratio", type=float, default=0.6)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1)
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument("--service-time", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--worker-concurrency", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args, args.url))
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Speedup of solving independent sub-networks in parallel over a monolithic run.
+
+Runs every bundled input file once as a whole and once split into
+partitions solved in separate processes. Run from the repository root, the
+input files reference the rain data relative to it.
+
+    python -m benchmarks.partition_speedup --processes 4
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from swmm.toolkit import solver
+
+from stormwater_api.config import INPUT_DIR
+from stormwater_api.partition import solve_partitioned
+
+
+def time_monolithic(inp_path: Path, work_dir: Path) -> float:
+    start = time.perf_counter()
+    solver.swmm_run(
+        str(inp_path), str(work_dir / "model.rpt"), str(work_dir / "model.out")
+    )
+    return time.perf_counter() - start
+
+
+def time_partitioned(inp_path: Path, work_dir: Path, processes: int) -> float:
+    start = time.perf_counter()
+    solve_partitioned(inp_path, work_dir, processes, timeout_seconds=3600)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # The solver reports progress on stdout, so the table is printed at the end.
+    rows = []
+    for inp_path in sorted(INPUT_DIR.glob("*.inp")):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            work_dir = Path(tmp_dir)
+            monolithic = min(
+                time_monolithic(inp_path, work_dir) for _ in range(args.repeat)
+            )
+            partitioned = min(
+                time_partitioned(inp_path, work_dir, args.processes)
+                for _ in range(args.repeat)
+            )
+        rows.append((inp_path.name, monolithic, partitioned))
+
+    print(f"\n{args.processes} processes, best of {args.repeat}")
+    print(f"{'input file':<36} {'monolithic':>11} {'partitioned':>12} {'speedup':>8}")
+    for name, monolithic, partitioned in rows:
+        print(
+            f"{name:<36} {monolithic:>10.3f}s {partitioned:>11.3f}s "
+            f"{monolithic / partitioned:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Stand-in for `ScenarioProcessor` that sleeps instead of running SWMM.
+
+Select it for the workers with
+`SCENARIO_PROCESSOR=benchmarks.stub_processor.StubScenarioProcessor`; the
+service time is drawn uniformly from
+`STUB_SERVICE_TIME_SECONDS` +/- `STUB_SERVICE_TIME_JITTER_SECONDS`.
+"""
+import os
+import random
+import time
+from pathlib import Path
+
+from stormwater_api.models.calculation_input import StormwaterCalculationInput
+
+
+class StubScenarioProcessor:
+    def __init__(
+        self,
+        task_definition: StormwaterCalculationInput,
+        base_output_dir: Path,
+        input_files_dir: Path,
+        rain_data_dir: Path,
+        processes: int = 1,
+        timeout_seconds: float = 3600,
+    ) -> None:
+        self.task = task_definition
+        self.service_time = float(os.environ.get("STUB_SERVICE_TIME_SECONDS", 0.5))
+        self.jitter = float(os.environ.get("STUB_SERVICE_TIME_JITTER_SECONDS", 0))
+
+    def perform_swmm_analysis(self):
+        time.sleep(
+            max(0.0, self.service_time + random.uniform(-self.jitter, self.jitter))
+        )
+        return {"rain": [], "geojson": self.task.subcatchments}
@@ -1,17 +1,22 @@
 import logging
+from typing import Optional
 
 from celery.result import AsyncResult
 from fastapi import APIRouter
 from fastapi.encoders import jsonable_encoder
 
-import stormwater_api.tasks as tasks
-from stormwater_api.dependencies import cache, celery_app
+import stormwater_api.task_signatures as task_signatures
+from stormwater_api.cache import job_key
+from stormwater_api.dependencies import cache, celery_app, queue_router
 from stormwater_api.models.calculation_input import StormwaterCalculationInput
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["jobs"])
 
+# State of a job whose result has been evicted from every cache tier.
+EXPIRED = "EXPIRED"
+
 
 @router.post("/processes/runoff/execution")
 async def process_job(
@@ -21,32 +26,71 @@ async def process_job(
         logger.info(
             f"Result fetched from cache with key: {calculation_input.celery_key}"
         )
+        # Results cached before jobs were referenced have no jobs:<job_id> entry.
+        if not cache.get(key=job_key(result["job_id"])):
+            cache.put(
+                key=job_key(result["job_id"]),
+                value={"celery_key": calculation_input.celery_key},
+            )
         return {"job_id": result["job_id"]}
 
     logger.info(
         f"Result with key: {calculation_input.celery_key} not found in cache. Starting calculation ..."
     )
-    result = tasks.compute_task.delay(jsonable_encoder(calculation_input))
+    route = queue_router.route(calculation_input)
+    logger.info(
+        f"Routing job to queue {route.queue} with priority {route.priority}, "
+        f"estimated to take {route.estimated_seconds:.1f}s."
+    )
+    result = task_signatures.compute_task.apply_async(
+        args=[jsonable_encoder(calculation_input)],
+        queue=route.queue,
+        priority=route.priority,
+    )
     return {"job_id": result.id}
 
 
-@router.get("/jobs/{job_id}/results")
-async def get_job_results(job_id: str):
+def _resolve_job(job_id: str) -> tuple[str, Optional[dict]]:
+    """State of a job and, once it succeeded, its result."""
+    # Finished jobs are served from the cache without touching the result backend.
+    reference = cache.get(key=job_key(job_id))
+    if reference is None:
+        async_result = AsyncResult(job_id, app=celery_app)
+        if not async_result.successful():
+            return async_result.state, None
+        reference = async_result.get()
+        # Jobs from before results were kept in the cache stored the payload itself.
+        if "celery_key" not in reference:
+            return "SUCCESS", reference
 
-    async_result = AsyncResult(job_id, app=celery_app)
+    if result := cache.get(key=reference["celery_key"]):
+        return "SUCCESS", result
+    # The result was evicted, its reference must not outlive it.
+    cache.delete(key=job_key(job_id))
+    return EXPIRED, None
 
-    if async_result.successful():
-        return {"result": async_result.get()}
+
+@router.get("/jobs/{job_id}/results")
+async def get_job_results(job_id: str):
+    state, result = _resolve_job(job_id)
+    if result is not None:
+        return {"result": result}
 
     return {
-        "job_id": async_result.id,
-        "job_state": async_result.state,
+        "job_id": job_id,
+        "job_state": state,
     }
 
 
 @router.get("/jobs/{job_id}/status")
 async def get_job_status(job_id: str):
-    async_result = AsyncResult(job_id, app=celery_app)
-    if async_result.state == "FAILURE":
+    state, _ = _resolve_job(job_id)
+    if state == "FAILURE":
+        async_result = AsyncResult(job_id, app=celery_app)
         return {"status": "FAILURE", "details": {str(async_result.get())}}
-    return {"status": async_result.state}
+    return {"status": state}
+
+
+@router.get("/cache/stats", tags=["cache"])
+async def get_cache_stats():
+    return cache.stats()
@@ -8,8 +8,10 @@ from stormwater_api.api.exception_handlers import (
     validation_exception_handler,
 )
 from stormwater_api.config import settings
+from stormwater_api.dependencies import cache
 from stormwater_api.exceptions import StormwaterApiError
 from stormwater_api.logs import setup_logging
+from stormwater_api.network_index import load_network_indexes
 
 setup_logging()
 
@@ -25,6 +27,16 @@ app = FastAPI(
 )
 
 
+@app.on_event("startup")
+def load_baseline_networks():
+    load_network_indexes()
+
+
+@app.on_event("startup")
+def start_cache_background_tasks():
+    cache.start_invalidation_listener()
+
+
 @app.get(f"{API_PREFIX}/health_check", tags=["ROOT"])
 async def health_check():
     return "ok"
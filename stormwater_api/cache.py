@@ -1,44 +1,274 @@
+import dataclasses
 import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
 
 from fastapi.encoders import jsonable_encoder
 
 import redis
+from stormwater_api.cold_storage import ColdStore
 from stormwater_api.config import RedisConnectionConfig
 
+logger = logging.getLogger(__name__)
+
+
+def make_redis_client(
+    connection_config: RedisConnectionConfig, decode_responses: bool = True
+) -> redis.Redis:
+    return redis.Redis(
+        host=connection_config.host,
+        port=connection_config.port,
+        db=connection_config.db,
+        username=connection_config.username,
+        password=connection_config.password,
+        ssl=connection_config.ssl,
+        decode_responses=decode_responses,
+    )
+
+
+def job_key(job_id: str) -> str:
+    """Key of the reference from a job to the cache key of its result."""
+    return f"jobs:{job_id}"
+
+
+@dataclasses.dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+@dataclasses.dataclass(frozen=True)
+class LocalVersion:
+    """State of a `LocalCache` before a value is read from Redis."""
+
+    sequence: int
+    taken_at: float
+
+
+@dataclasses.dataclass
+class _LocalEntry:
+    value: dict
+    size_bytes: int
+    expires_at: float
+
+
+class LocalCache:
+    """In-process LRU cache bounded by the serialized size of its entries.
+
+    `max_bytes` is a budget for the serialized JSON; the deserialized values
+    it holds take several times as much memory. Values are shared between
+    callers, so they must be treated as read-only.
+
+    A value read from Redis is only cached if its key was not invalidated
+    since `version()` was taken before the read, otherwise a read racing
+    with another process's write could cache the old value.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: int):
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, _LocalEntry] = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._cleared_at = 0
+        # Sequence number and time of recent invalidations, oldest first.
+        self._invalidated: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self.stats = CacheStats()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size_bytes
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry.value
+
+    def version(self) -> LocalVersion:
+        with self._lock:
+            return LocalVersion(sequence=self._sequence, taken_at=time.monotonic())
+
+    def put(
+        self,
+        key: str,
+        value: dict,
+        size_bytes: int,
+        version: Optional[LocalVersion] = None,
+    ) -> None:
+        if size_bytes > self._max_bytes:
+            return
+        with self._lock:
+            now = time.monotonic()
+            # Entries expire relative to the read, which lets invalidations be
+            # forgotten once they are older than the TTL.
+            expires_at = (version.taken_at if version else now) + self._ttl_seconds
+            if expires_at <= now or self._invalidated_since(key, version):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _LocalEntry(
+                value=value,
+                size_bytes=size_bytes,
+                expires_at=expires_at,
+            )
+            self._size_bytes += size_bytes
+            while self._size_bytes > self._max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.stats.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._sequence += 1
+            self._invalidated[key] = (self._sequence, now)
+            self._invalidated.move_to_end(key)
+            while next(iter(self._invalidated.values()))[1] < now - self._ttl_seconds:
+                self._invalidated.popitem(last=False)
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sequence += 1
+            self._cleared_at = self._sequence
+            self._invalidated.clear()
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def _invalidated_since(self, key: str, version: Optional[LocalVersion]) -> bool:
+        if version is None:
+            return False
+        invalidated_at, _ = self._invalidated.get(key, (0, 0))
+        return max(invalidated_at, self._cleared_at) > version.sequence
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._size_bytes -= entry.size_bytes
+
 
 class Cache:
     def __init__(
-        self, connection_config: RedisConnectionConfig, key_prefix: str, ttl_days: int
+        self,
+        connection_config: RedisConnectionConfig,
+        key_prefix: str,
+        ttl_days: int,
+        local_cache: Optional[LocalCache] = None,
+        cold_store: Optional[ColdStore] = None,
+        listener_retry_seconds: float = 5,
     ):
-        self._redis = redis.Redis(
-            host=connection_config.host,
-            port=connection_config.port,
-            db=connection_config.db,
-            username=connection_config.username,
-            password=connection_config.password,
-            ssl=connection_config.ssl,
-            decode_responses=True,
-        )
+        self._redis = make_redis_client(connection_config)
         self._key_prefix = key_prefix
         self._ttl_days = ttl_days
+        self._local = local_cache
+        self._cold_store = cold_store
+        # The local layer is only consulted while we are subscribed to
+        # invalidations, otherwise other processes' writes could go unnoticed.
+        self._local_active = False
+        self._listener: Optional[threading.Thread] = None
+        self._listener_retry_seconds = listener_retry_seconds
 
     def get(self, *, key: str) -> dict:
-        key = self._make_key(key)
-        serialized_value = self._redis.get(key)
+        version = None
+        if self._local_active:
+            value = self._local.get(key)
+            if value is not None:
+                return value
+            version = self._local.version()
+
+        serialized_value = self._redis.get(self._make_key(key))
+        if serialized_value is None and self._cold_store is not None:
+            serialized_value = self._cold_store.get(key)
+            if serialized_value is not None:
+                self._redis.setex(self._make_key(key), self._ttl, serialized_value)
         if serialized_value is None:
             return None
-        return json.loads(serialized_value)
+        value = json.loads(serialized_value)
+
+        if self._local_active and version is not None:
+            self._local.put(key, value, len(serialized_value), version)
+        return value
 
     def put(self, *, key: str, value: dict) -> None:
-        key = self._make_key(key)
         jsonable_value = jsonable_encoder(value)
         serialized_value = json.dumps(jsonable_value)
-        ttl = self._ttl_days * 86400
-        self._redis.setex(key, ttl, serialized_value)
+        self._redis.setex(self._make_key(key), self._ttl, serialized_value)
+        if self._cold_store is not None:
+            self._cold_store.put(key, serialized_value)
+        self._invalidate(key)
 
     def delete(self, *, key: str) -> None:
-        key = self._make_key(key)
-        self._redis.delete(key)
+        self._redis.delete(self._make_key(key))
+        if self._cold_store is not None:
+            self._cold_store.delete(key)
+        self._invalidate(key)
+
+    def stats(self) -> dict:
+        if self._local is None:
+            return {"local_cache_enabled": False}
+        return {
+            "local_cache_enabled": self._local_active,
+            "size_bytes": self._local.size_bytes,
+            **dataclasses.asdict(self._local.stats),
+        }
+
+    def start_invalidation_listener(self) -> None:
+        """Subscribe to invalidations published by other processes in the background."""
+        if self._local is None or self._listener is not None:
+            return
+        self._listener = threading.Thread(
+            target=self._listen_for_invalidations,
+            name="cache-invalidation-listener",
+            daemon=True,
+        )
+        self._listener.start()
+
+    def _listen_for_invalidations(self) -> None:
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self._invalidation_channel)
+                # Anything cached before (re)subscribing may have missed invalidations.
+                self._local.clear()
+                self._local_active = True
+                for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._local.delete(message["data"])
+            except redis.RedisError:
+                logger.warning(
+                    "Cache invalidation listener disconnected, local cache disabled."
+                )
+            finally:
+                self._local_active = False
+                pubsub.close()
+            time.sleep(self._listener_retry_seconds)
+
+    def _invalidate(self, key: str) -> None:
+        if self._local is not None:
+            self._local.delete(key)
+        self._redis.publish(self._invalidation_channel, key)
+
+    @property
+    def _ttl(self) -> int:
+        return self._ttl_days * 86400
+
+    @property
+    def _invalidation_channel(self) -> str:
+        return self._make_key("invalidate")
 
     def _make_key(self, key: str) -> str:
         return f"{self._key_prefix}:{key}"
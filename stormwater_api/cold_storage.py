@@ -0,0 +1,40 @@
+import zlib
+from typing import Optional
+
+import redis
+
+
+class ColdStore:
+    """Compressed result store backing the Redis cache.
+
+    Results live in a Redis instance of their own, which the API and the
+    workers share across hosts. That instance must be configured with
+    `maxmemory` and the `allkeys-lru` eviction policy: it bounds its size by
+    dropping the least recently read results, and results are dropped after
+    `retention_days` in any case. Compressed, results take a fraction of the
+    memory they take in the hot cache.
+    """
+
+    def __init__(self, client: redis.Redis, key_prefix: str, retention_days: int):
+        self._redis = client
+        self._key_prefix = key_prefix
+        self._retention_seconds = retention_days * 86400
+
+    def get(self, key: str) -> Optional[str]:
+        compressed_value = self._redis.get(self._make_key(key))
+        if compressed_value is None:
+            return None
+        return zlib.decompress(compressed_value).decode()
+
+    def put(self, key: str, serialized_value: str) -> None:
+        self._redis.setex(
+            self._make_key(key),
+            self._retention_seconds,
+            zlib.compress(serialized_value.encode()),
+        )
+
+    def delete(self, key: str) -> None:
+        self._redis.delete(self._make_key(key))
+
+    def _make_key(self, key: str) -> str:
+        return f"{self._key_prefix}:{key}"
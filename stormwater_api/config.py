@@ -1,7 +1,13 @@
+from pathlib import Path
 from typing import Literal, Optional
 
 from pydantic import BaseSettings, Field
 
+DATA_DIR = Path(__file__).parent / "data"
+INPUT_DIR = DATA_DIR / "input_files"
+OUTPUT_DIR = DATA_DIR / "output"
+RAIN_DATA_DIR = DATA_DIR / "rain_data"
+
 
 class RedisConnectionConfig(BaseSettings):
     host: str = Field(..., env="REDIS_HOST")
@@ -12,10 +18,41 @@ class RedisConnectionConfig(BaseSettings):
     ssl: bool = Field(..., env="REDIS_SSL")
 
 
+class CacheLocal(BaseSettings):
+    # Budget for the serialized JSON of the cached results, not for their
+    # in-memory size, which is several times larger.
+    max_bytes: int = Field(64 * 1024 * 1024, env="LOCAL_CACHE_MAX_BYTES")
+    ttl_seconds: int = Field(300, env="LOCAL_CACHE_TTL_SECONDS")
+
+
+class ColdStorageConnectionConfig(RedisConnectionConfig):
+    # A separate instance with LRU eviction; without a host there is no cold tier.
+    host: Optional[str] = Field(None, env="COLD_STORAGE_REDIS_HOST")
+    port: int = Field(6379, env="COLD_STORAGE_REDIS_PORT")
+    db: int = Field(0, env="COLD_STORAGE_REDIS_DB")
+    username: str = Field("", env="COLD_STORAGE_REDIS_USERNAME")
+    password: str = Field("", env="COLD_STORAGE_REDIS_PASSWORD")
+    ssl: bool = Field(False, env="COLD_STORAGE_REDIS_SSL")
+
+
+class CacheColdStorage(BaseSettings):
+    connection: ColdStorageConnectionConfig = Field(
+        default_factory=ColdStorageConnectionConfig
+    )
+    retention_days: int = Field(30, env="COLD_STORAGE_RETENTION_DAYS")
+
+    @property
+    def enabled(self) -> bool:
+        return self.connection.host is not None
+
+
 class CacheRedis(BaseSettings):
     connection: RedisConnectionConfig = Field(default_factory=RedisConnectionConfig)
     key_prefix: str = "water_simulations"
-    ttl_days: int = Field(30, env="REDIS_CACHE_TTL_DAYS")
+    # Only hot results stay in Redis, older ones are served from cold storage.
+    ttl_days: int = Field(2, env="REDIS_CACHE_TTL_DAYS")
+    local: CacheLocal = Field(default_factory=CacheLocal)
+    cold_storage: CacheColdStorage = Field(default_factory=CacheColdStorage)
 
     @property
     def redis_url(self) -> str:
@@ -36,6 +73,22 @@ class BrokerCelery(BaseSettings):
     result_persistent: bool = True
     enable_utc: bool = True
     task_default_queue: str = "swimdock"
+    worker_prefetch_multiplier: int = 1
+    broker_transport_options: dict = {
+        "queue_order_strategy": "priority",
+        "priority_steps": list(range(10)),
+    }
+
+
+class QueueRouting(BaseSettings):
+    fast_queue: str = "swimdock_fast"
+    slow_queue: str = "swimdock_slow"
+    # Jobs estimated to take longer than this are sent to the slow queue.
+    fast_queue_max_seconds: float = Field(5, env="FAST_QUEUE_MAX_SECONDS")
+    timing_samples: int = Field(500, env="ROUTING_TIMING_SAMPLES")
+    calibration_interval_seconds: int = Field(
+        300, env="ROUTING_CALIBRATION_INTERVAL_SECONDS"
+    )
 
 
 class Settings(BaseSettings):
@@ -46,7 +99,16 @@ class Settings(BaseSettings):
     log_level: Optional[Literal["DEBUG", "INFO"]] = Field("INFO", env="LOG_LEVEL")
     cache: CacheRedis = Field(default_factory=CacheRedis)
     broker: BrokerCelery = Field(default_factory=BrokerCelery)
+    routing: QueueRouting = Field(default_factory=QueueRouting)
     environment: Optional[Literal["LOCALDEV", "PROD"]] = Field(..., env="ENVIRONMENT")
+    # Dotted path of the class the workers run scenarios with, e.g. a stub for load tests.
+    scenario_processor: str = Field(
+        "stormwater_api.processor.ScenarioProcessor", env="SCENARIO_PROCESSOR"
+    )
+    # Processes each job may use to solve independent sub-networks in parallel.
+    simulation_processes: int = Field(1, env="SIMULATION_PROCESSES")
+    # Seconds a job may spend solving its sub-networks before the solvers are killed.
+    simulation_timeout_seconds: int = Field(3600, env="SIMULATION_TIMEOUT_SECONDS")
 
 
 settings = Settings()
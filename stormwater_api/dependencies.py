@@ -1,14 +1,71 @@
 from celery import Celery
+from kombu import Queue
 
-from stormwater_api.cache import Cache
-from stormwater_api.config import settings
+from stormwater_api.cache import Cache, LocalCache, make_redis_client
+from stormwater_api.cold_storage import ColdStore
+from stormwater_api.config import INPUT_DIR, settings
+from stormwater_api.routing import QueueRouter, TimingStore
+
+cold_store = (
+    ColdStore(
+        # Results are stored compressed, so responses must not be decoded.
+        client=make_redis_client(
+            settings.cache.cold_storage.connection, decode_responses=False
+        ),
+        key_prefix=f"{settings.cache.key_prefix}:cold",
+        retention_days=settings.cache.cold_storage.retention_days,
+    )
+    if settings.cache.cold_storage.enabled
+    else None
+)
 
 cache = Cache(
     connection_config=settings.cache.connection,
     key_prefix=settings.cache.key_prefix,
     ttl_days=settings.cache.ttl_days,
+    local_cache=LocalCache(
+        max_bytes=settings.cache.local.max_bytes,
+        ttl_seconds=settings.cache.local.ttl_seconds,
+    ),
+    cold_store=cold_store,
 )
 
 celery_app = Celery(
     __name__, broker=settings.cache.broker_url, backend=settings.cache.result_backend
 )
+# Only the settings queue routing relies on; the others keep Celery's defaults.
+celery_app.conf.update(
+    settings.broker.dict(
+        include={
+            "task_default_queue",
+            "worker_prefetch_multiplier",
+            "broker_transport_options",
+        }
+    )
+)
+# Workers started without -Q, like the single worker deployment, consume all
+# of these. "celery" drains jobs enqueued before queue routing was introduced.
+celery_app.conf.task_queues = [
+    Queue(name)
+    for name in [
+        settings.routing.fast_queue,
+        settings.routing.slow_queue,
+        settings.broker.task_default_queue,
+        "celery",
+    ]
+]
+
+timing_store = TimingStore(
+    connection_config=settings.cache.connection,
+    key_prefix=settings.cache.key_prefix,
+    max_samples=settings.routing.timing_samples,
+)
+
+queue_router = QueueRouter(
+    timing_store=timing_store,
+    input_files_dir=INPUT_DIR,
+    fast_queue=settings.routing.fast_queue,
+    slow_queue=settings.routing.slow_queue,
+    fast_queue_max_seconds=settings.routing.fast_queue_max_seconds,
+    calibration_interval_seconds=settings.routing.calibration_interval_seconds,
+)
@@ -0,0 +1,49 @@
+"""Minimal reader for SWMM .inp files.
+
+Unlike `swmmio`, this does not depend on pandas, so it is cheap enough to use
+from the API process.
+"""
+from datetime import datetime
+from pathlib import Path
+
+Sections = dict[str, list[list[str]]]
+
+# Sections whose rows each define a node.
+NODE_TYPE_SECTIONS = ["JUNCTIONS", "OUTFALLS", "DIVIDERS", "STORAGE"]
+
+
+def read_sections(path: Path) -> Sections:
+    """Return the whitespace separated rows of every section, keyed by upper-cased section name."""
+    sections: Sections = {}
+    rows: list[list[str]] = []
+    with open(path, "r") as file:
+        for line in file:
+            line = line.split(";", 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith("[") and line.endswith("]"):
+                rows = sections.setdefault(line[1:-1].upper(), [])
+                continue
+            rows.append(line.split())
+    return sections
+
+
+def element_ids(sections: Sections, section: str) -> list[str]:
+    return [row[0] for row in sections.get(section, [])]
+
+
+def options(sections: Sections) -> dict[str, str]:
+    return {
+        row[0].upper(): row[1] for row in sections.get("OPTIONS", []) if len(row) > 1
+    }
+
+
+def simulation_minutes(sections: Sections) -> int:
+    options_ = options(sections)
+    start = _parse_datetime(options_["START_DATE"], options_["START_TIME"])
+    end = _parse_datetime(options_["END_DATE"], options_["END_TIME"])
+    return int((end - start).total_seconds() / 60)
+
+
+def _parse_datetime(date_str: str, time_str: str) -> datetime:
+    return datetime.strptime(f"{date_str} {time_str}", "%d/%m/%Y %H:%M:%S")
@@ -3,9 +3,10 @@ import json
 from enum import auto
 
 from fastapi.encoders import jsonable_encoder
-from pydantic import validator
+from pydantic import root_validator, validator
 
 from stormwater_api.models.base import BaseModelStrict, StrEnum
+from stormwater_api.network_index import get_network_index
 
 
 def hash_dict(dict_) -> str:
@@ -13,6 +14,14 @@ def hash_dict(dict_) -> str:
     return hashlib.md5(dict_str.encode()).hexdigest()
 
 
+def make_input_filename(flow_path: str, roofs: str, return_period: int) -> str:
+    return f"{flow_path}_{roofs}_{return_period}.inp"
+
+
+def format_ids(ids: set[str]) -> str:
+    return ", ".join(sorted(ids))
+
+
 class FlowPath(StrEnum):
     blockToStreet = auto()
     blockToPark = auto()
@@ -36,17 +45,61 @@ class StormwaterScenario(BaseModelStrict):
 
     @property
     def input_filename(self) -> str:
-        return f"{self.flow_path}_{self.roofs}_{self.return_period}.inp"
+        return make_input_filename(self.flow_path, self.roofs, self.return_period)
 
     @validator("return_period")
     def validate_return_period(cls, v) -> int:
         assert v in [2, 10, 100], "Return period must be on of [2, 10, 100]"
         return v
 
+    @root_validator(skip_on_failure=True)
+    def validate_model_updates(cls, values) -> dict:
+        network = get_network_index(
+            make_input_filename(
+                values["flow_path"], values["roofs"], values["return_period"]
+            )
+        )
+        updates = values["model_updates"] or []
+
+        unknown_subcatchments = {
+            u.subcatchment_id for u in updates
+        } - network.subcatchments
+        assert (
+            not unknown_subcatchments
+        ), f"Unknown subcatchment_id: {format_ids(unknown_subcatchments)}"
+
+        unknown_outlets = {u.outlet_id for u in updates} - network.outlets
+        assert not unknown_outlets, f"Unknown outlet_id: {format_ids(unknown_outlets)}"
+        return values
+
 
 class StormwaterCalculationInput(StormwaterScenario):
     subcatchments: dict
 
+    @root_validator(skip_on_failure=True)
+    def validate_subcatchments(cls, values) -> dict:
+        network = get_network_index(
+            make_input_filename(
+                values["flow_path"], values["roofs"], values["return_period"]
+            )
+        )
+        features = values["subcatchments"].get("features", [])
+        assert isinstance(features, list), "subcatchments.features must be a list"
+
+        names = set()
+        for feature in features:
+            assert isinstance(feature, dict), "Each feature must be an object"
+            properties = feature.get("properties") or {}
+            assert isinstance(properties, dict), "Feature properties must be an object"
+            name = properties.get("name_sub")
+            assert name is None or isinstance(
+                name, str
+            ), f"name_sub must be a string, got: {name!r}"
+            names.add(name)
+        unknown_names = names - network.subcatchments - {None}
+        assert not unknown_names, f"Unknown name_sub: {format_ids(unknown_names)}"
+        return values
+
     @property
     def scenario_hash(self) -> str:
         return hash_dict(
@@ -0,0 +1,42 @@
+import dataclasses
+import functools
+from pathlib import Path
+
+from stormwater_api import inp
+from stormwater_api.config import INPUT_DIR
+
+
+@dataclasses.dataclass(frozen=True)
+class NetworkIndex:
+    """Ids of the elements of a baseline model, for validating requests against it."""
+
+    subcatchments: frozenset[str]
+    nodes: frozenset[str]
+
+    @classmethod
+    def from_inp(cls, path: Path) -> "NetworkIndex":
+        sections = inp.read_sections(path)
+        return cls(
+            subcatchments=frozenset(inp.element_ids(sections, "SUBCATCHMENTS")),
+            nodes=frozenset(
+                id_
+                for section in inp.NODE_TYPE_SECTIONS
+                for id_ in inp.element_ids(sections, section)
+            ),
+        )
+
+    @property
+    def outlets(self) -> frozenset[str]:
+        # Subcatchments drain either to a node or onto another subcatchment.
+        return self.nodes | self.subcatchments
+
+
+@functools.lru_cache(maxsize=None)
+def get_network_index(input_filename: str) -> NetworkIndex:
+    return NetworkIndex.from_inp(INPUT_DIR / input_filename)
+
+
+def load_network_indexes() -> None:
+    """Index every baseline model up front, so no request pays for parsing one."""
+    for path in sorted(INPUT_DIR.glob("*.inp")):
+        get_network_index(path.name)
@@ -0,0 +1,277 @@
+"""Splitting a SWMM model into independent sub-networks that can be simulated in parallel.
+
+Subcatchments, nodes and links are joined into a graph by subcatchment
+outlets, LID drains, groundwater receiving nodes and link end nodes. Outfalls
+act as sinks and do not join the sub-networks draining into them: water
+reaching an outfall leaves the model, so the runoff of a subcatchment only
+depends on its own sub-network. Each partition keeps the outfalls its
+sub-networks drain to. Outfalls that route their outflow onto a subcatchment
+are ordinary nodes.
+
+All elements named in [CONTROLS] are kept in one sub-network, since rules
+and the variables they share cannot be split. The partition holding them
+keeps the section, the others drop its rows.
+"""
+import dataclasses
+import logging
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from swmm.toolkit import solver
+
+from stormwater_api import inp
+
+logger = logging.getLogger(__name__)
+
+SUBCATCHMENT_SECTIONS = [
+    "SUBCATCHMENTS",
+    "SUBAREAS",
+    "INFILTRATION",
+    "LID_USAGE",
+    "GROUNDWATER",
+    "GWF",
+    "COVERAGES",
+    "LOADINGS",
+    "POLYGONS",
+]
+NODE_SECTIONS = inp.NODE_TYPE_SECTIONS + [
+    "INFLOWS",
+    "DWF",
+    "RDII",
+    "TREATMENT",
+    "COORDINATES",
+]
+# Link sections whose rows start with: name, from node, to node.
+LINK_TYPE_SECTIONS = ["CONDUITS", "PUMPS", "ORIFICES", "WEIRS", "OUTLETS"]
+LINK_SECTIONS = LINK_TYPE_SECTIONS + ["XSECTIONS", "LOSSES", "VERTICES"]
+ELEMENT_SECTIONS = set(SUBCATCHMENT_SECTIONS + NODE_SECTIONS + LINK_SECTIONS)
+# Keywords followed by an element name in control rules, e.g. "IF NODE J1 DEPTH > 2".
+CONTROL_OBJECTS = {
+    "NODE",
+    "LINK",
+    "CONDUIT",
+    "PUMP",
+    "ORIFICE",
+    "WEIR",
+    "OUTLET",
+    "SUBCATCHMENT",
+}
+# Outfall types that take an extra stage data column before the gated flag.
+STAGED_OUTFALL_TYPES = {"FIXED", "TIDAL", "TIMESERIES"}
+
+
+@dataclasses.dataclass
+class SubNetwork:
+    elements: set[str]
+    subcatchment_count: int
+
+
+class _UnionFind:
+    def __init__(self):
+        self._parents: dict[str, str] = {}
+
+    def find(self, element: str) -> str:
+        self._parents.setdefault(element, element)
+        while self._parents[element] != element:
+            self._parents[element] = self._parents[self._parents[element]]
+            element = self._parents[element]
+        return element
+
+    def union(self, a: str, b: str) -> None:
+        self._parents[self.find(a)] = self.find(b)
+
+
+def _outfall_route_to(row: list[str]) -> str | None:
+    route_to_column = 5 if row[2].upper() in STAGED_OUTFALL_TYPES else 4
+    return row[route_to_column] if len(row) > route_to_column else None
+
+
+def control_elements(sections: inp.Sections) -> set[str]:
+    return {
+        element
+        for row in sections.get("CONTROLS", [])
+        for keyword, element in zip(row, row[1:])
+        if keyword.upper() in CONTROL_OBJECTS
+    }
+
+
+def find_subnetworks(sections: inp.Sections) -> list[SubNetwork]:
+    subcatchments = inp.element_ids(sections, "SUBCATCHMENTS")
+    sinks = {
+        row[0] for row in sections.get("OUTFALLS", []) if not _outfall_route_to(row)
+    }
+
+    edges = [(row[0], row[2]) for row in sections.get("SUBCATCHMENTS", [])]
+    edges += [
+        (row[0], row[9])
+        for row in sections.get("LID_USAGE", [])
+        if len(row) > 9 and row[9] != "*"
+    ]
+    edges += [(row[0], row[2]) for row in sections.get("GROUNDWATER", [])]
+    for section in LINK_TYPE_SECTIONS:
+        for row in sections.get(section, []):
+            edges += [(row[0], row[1]), (row[0], row[2])]
+    for row in sections.get("OUTFALLS", []):
+        if route_to := _outfall_route_to(row):
+            edges.append((row[0], route_to))
+    controlled = control_elements(sections)
+    if anchors := sorted(controlled - sinks):
+        edges += [(anchors[0], element) for element in controlled]
+
+    components = _UnionFind()
+    drains_to: dict[str, set[str]] = {}
+    for a, b in edges:
+        if a in sinks or b in sinks:
+            element, sink = (b, a) if a in sinks else (a, b)
+            drains_to.setdefault(element, set()).add(sink)
+            components.find(element)
+        else:
+            components.union(a, b)
+
+    elements = set(subcatchments)
+    for section in inp.NODE_TYPE_SECTIONS + LINK_TYPE_SECTIONS:
+        elements.update(inp.element_ids(sections, section))
+    elements -= sinks
+
+    subnetworks: dict[str, SubNetwork] = {}
+    subcatchment_ids = set(subcatchments)
+    for element in elements:
+        subnetwork = subnetworks.setdefault(
+            components.find(element), SubNetwork(elements=set(), subcatchment_count=0)
+        )
+        subnetwork.elements.add(element)
+        subnetwork.elements.update(drains_to.get(element, set()))
+        subnetwork.subcatchment_count += element in subcatchment_ids
+
+    # Outfalls nothing drains to still belong somewhere.
+    drained_sinks = set().union(*drains_to.values()) if drains_to else set()
+    for sink in sinks - drained_sinks:
+        subnetworks[sink] = SubNetwork(elements={sink}, subcatchment_count=0)
+
+    return list(subnetworks.values())
+
+
+def group_subnetworks(
+    subnetworks: list[SubNetwork], max_partitions: int
+) -> list[set[str]]:
+    """Pack sub-networks into at most `max_partitions` partitions of similar size."""
+    partitions: list[tuple[int, set[str]]] = [
+        (0, set()) for _ in range(min(max_partitions, len(subnetworks)))
+    ]
+    for subnetwork in sorted(
+        subnetworks, key=lambda s: (s.subcatchment_count, len(s.elements)), reverse=True
+    ):
+        i = min(range(len(partitions)), key=lambda i: partitions[i][0])
+        weight, elements = partitions[i]
+        partitions[i] = (
+            weight + subnetwork.subcatchment_count,
+            elements | subnetwork.elements,
+        )
+    return [elements for _, elements in partitions if elements]
+
+
+def write_partition(
+    source_path: Path,
+    dest_path: Path,
+    keep: set[str],
+    all_elements: set[str],
+    controlled: set[str] = frozenset(),
+) -> None:
+    """Copy `source_path` without the rows of elements that are not in `keep`.
+
+    The control rules are dropped unless `keep` holds the `controlled` elements.
+    """
+    drop = all_elements - keep
+    drop_controls = bool(controlled & drop)
+    section = None
+    with open(source_path, "r") as source, open(dest_path, "w") as dest:
+        for line in source:
+            tokens = line.split(";", 1)[0].split()
+            if tokens and tokens[0].startswith("[") and tokens[0].endswith("]"):
+                section = tokens[0][1:-1].upper()
+            elif tokens and section in ELEMENT_SECTIONS and tokens[0] in drop:
+                continue
+            elif tokens and section == "CONTROLS" and drop_controls:
+                continue
+            elif tokens and section == "TAGS" and len(tokens) > 1 and tokens[1] in drop:
+                continue
+            elif tokens and section == "REPORT" and set(tokens[1:]) & drop:
+                line = " ".join(t for t in tokens if t not in drop) + "\n"
+            dest.write(line)
+
+
+def write_partitions(
+    source_path: Path, output_dir: Path, max_partitions: int
+) -> list[Path]:
+    """Split the model at `source_path` into up to `max_partitions` .inp files in `output_dir`."""
+    sections = inp.read_sections(source_path)
+    subnetworks = find_subnetworks(sections)
+    all_elements = set().union(*(s.elements for s in subnetworks))
+    controlled = control_elements(sections)
+
+    paths = []
+    for i, keep in enumerate(group_subnetworks(subnetworks, max_partitions)):
+        path = output_dir / f"partition_{i}.inp"
+        write_partition(source_path, path, keep, all_elements, controlled)
+        paths.append(path)
+    return paths
+
+
+def solve_partitioned(
+    source_path: Path, output_dir: Path, max_partitions: int, timeout_seconds: float
+) -> list[str]:
+    """Solve the partitions of a model concurrently and return their output files.
+
+    Each partition is solved by a separate Python process started with
+    `subprocess`: the solver keeps global state, so it cannot run in threads,
+    and Celery's prefork workers are daemonic, so they cannot use
+    `multiprocessing`. If a partition fails or they are not all solved within
+    `timeout_seconds`, the remaining solvers are killed and `RuntimeError` is
+    raised.
+    """
+    inp_paths = write_partitions(source_path, output_dir, max_partitions)
+    logger.info(f"Computing {len(inp_paths)} independent sub-networks...")
+
+    output_paths = [str(path.with_suffix(".out")) for path in inp_paths]
+    deadline = time.monotonic() + timeout_seconds
+    solvers = [
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "stormwater_api.partition",
+                str(path),
+                str(path.with_suffix(".rpt")),
+                output_path,
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        for path, output_path in zip(inp_paths, output_paths)
+    ]
+    try:
+        for path, process in zip(inp_paths, solvers):
+            try:
+                _, stderr = process.communicate(
+                    timeout=max(0.0, deadline - time.monotonic())
+                )
+            except subprocess.TimeoutExpired:
+                raise RuntimeError(
+                    f"Solving partitions took longer than {timeout_seconds}s"
+                ) from None
+            if process.returncode != 0:
+                raise RuntimeError(f"Solving {path.name} failed: {stderr.strip()}")
+    finally:
+        for process in solvers:
+            if process.poll() is None:
+                process.kill()
+                process.communicate()
+    return output_paths
+
+
+if __name__ == "__main__":
+    # Entry point of the solver processes started by `solve_partitioned`.
+    solver.swmm_run(*sys.argv[1:4])
@@ -13,6 +13,7 @@ from stormwater_api.models.calculation_input import (
     ModelUpdate,
     StormwaterCalculationInput,
 )
+from stormwater_api.partition import solve_partitioned
 
 logger = logging.getLogger(__name__)
 
@@ -31,9 +32,13 @@ class ScenarioProcessor:
         base_output_dir: Path,
         input_files_dir: Path,
         rain_data_dir: Path,
+        processes: int = 1,
+        timeout_seconds: float = 3600,
     ) -> None:
 
         self.task = task_definition
+        self.processes = processes
+        self.timeout_seconds = timeout_seconds
         self.scenario_inp_path = input_files_dir / self.task.input_filename
         self.scenario_output_dir = base_output_dir / self.task.scenario_hash
         self.rain_data_dir = rain_data_dir
@@ -57,18 +62,31 @@ class ScenarioProcessor:
         )
 
         logger.info("Computing scenario...")
-        solver.swmm_run(
-            self.scenario_output_path,
-            self.rpt_file_output_path,
-            self.calculation_output_path,
-        )
+        output_paths = self._run_simulation()
         time.sleep(1)
 
         return {
             "rain": self._get_rain_for(self.task.return_period),
-            "geojson": self._get_result_geojson(),
+            "geojson": self._get_result_geojson(output_paths),
         }
 
+    def _run_simulation(self) -> list[str]:
+        if self.processes <= 1:
+            solver.swmm_run(
+                self.scenario_output_path,
+                self.rpt_file_output_path,
+                self.calculation_output_path,
+            )
+            return [self.calculation_output_path]
+
+        # Hydraulically independent sub-networks are solved concurrently.
+        return solve_partitioned(
+            Path(self.scenario_output_path),
+            self.scenario_output_dir,
+            self.processes,
+            self.timeout_seconds,
+        )
+
     # reads the relevant rain_data file for the calculation settings and returns the rain data as list
     # I did try to read it directly from the scenario.inp/out/rpt files instead,
     def _get_rain_for(self, return_period: int) -> list:
@@ -153,45 +171,60 @@ class ScenarioProcessor:
             if item.is_file():
                 item.unlink()  # Delete the file
 
-    def _get_result_geojson(
-        self,
-    ):
-        sim_duration, report_step = self._get_sim_duration_and_report_step()
-
+    @staticmethod
+    def _get_runoff_series(
+        output_path: str, names: set[str], sim_duration: int
+    ) -> dict[str, list[float]]:
         _handle = output.init()
-        output.open(_handle, self.calculation_output_path)
+        output.open(_handle, output_path)
 
         subcatchment_count = output.get_proj_size(_handle)[0]
 
-        # lookup table for result index by subcatchment name
-        result_sub_indexes = {}
+        run_offs = {}
         for i in range(subcatchment_count):
             try:
-                result_sub_indexes[
-                    output.get_elem_name(_handle, shared_enum.SubcatchResult, i)
-                ] = i
+                name = output.get_elem_name(_handle, shared_enum.SubcatchResult, i)
             except Exception:
                 logger.info("missing a sub?? ", i)
+                continue
+            if name in names:
+                run_offs[name] = output.get_subcatch_series(
+                    _handle, i, RUNOFF_ENUM, 0, sim_duration
+                )
+
+        output.close(_handle)
+        return run_offs
+
+    def _get_result_geojson(self, output_paths: list[str]):
+        sim_duration, report_step = self._get_sim_duration_and_report_step()
 
-        # iterate over subcatchemnt features in geojson and get timeseries results for subcatchment
         geojson = load_geojson(self.subcatchments_output_path)
+        names = {
+            (f.get("properties") or {}).get("name_sub") for f in geojson["features"]
+        }
+
+        # each output file holds the results of a disjoint set of subcatchments
+        run_offs_by_sub = {}
+        for output_path in output_paths:
+            run_offs_by_sub.update(
+                self._get_runoff_series(output_path, names, sim_duration)
+            )
+
+        # iterate over subcatchemnt features in geojson and get timeseries results for subcatchment
         for feature in geojson["features"]:
+            properties = feature.get("properties") or {}
             try:
-                sub_id = result_sub_indexes[feature["properties"]["name_sub"]]
+                run_offs = run_offs_by_sub[properties["name_sub"]]
             except Exception:
                 logger.info("missing sub id in result", feature)
                 continue
 
-            run_offs = output.get_subcatch_series(
-                _handle, sub_id, RUNOFF_ENUM, 0, sim_duration
-            )
             timestamps = [i * report_step for i, val in enumerate(run_offs)]
-            feature["properties"]["runoff_results"] = {
+            properties["runoff_results"] = {
                 "timestamps": timestamps,
                 "runoff_value": run_offs,
             }
 
-        output.close(_handle)
         self._clean_up()
 
         return geojson
@@ -0,0 +1,196 @@
+import dataclasses
+import functools
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Optional
+
+import redis
+from stormwater_api import inp
+from stormwater_api.cache import make_redis_client
+from stormwater_api.config import RedisConnectionConfig
+from stormwater_api.models.calculation_input import StormwaterScenario
+
+logger = logging.getLogger(__name__)
+
+MAX_PRIORITY = 9
+
+
+@dataclasses.dataclass(frozen=True)
+class CostFeatures:
+    return_period: int
+    simulation_minutes: int
+    subcatchment_count: int
+    update_count: int
+
+    def vector(self) -> list[float]:
+        # Solver work grows with simulated time steps times model elements,
+        # heavier rain makes each step more expensive.
+        work = self.simulation_minutes * self.subcatchment_count / 1000
+        return [1.0, work, work * self.return_period / 100, float(self.update_count)]
+
+
+@functools.lru_cache(maxsize=None)
+def _model_size(inp_path: Path) -> tuple[int, int]:
+    sections = inp.read_sections(inp_path)
+    subcatchment_count = len(inp.element_ids(sections, "SUBCATCHMENTS"))
+    return inp.simulation_minutes(sections), subcatchment_count
+
+
+def scenario_features(
+    scenario: StormwaterScenario, input_files_dir: Path
+) -> CostFeatures:
+    simulation_minutes, subcatchment_count = _model_size(
+        input_files_dir / scenario.input_filename
+    )
+    return CostFeatures(
+        return_period=scenario.return_period,
+        simulation_minutes=simulation_minutes,
+        subcatchment_count=subcatchment_count,
+        update_count=len(scenario.model_updates or []),
+    )
+
+
+class CostModel:
+    """Linear estimate of a job's run time in seconds.
+
+    Fitted by ridge regression towards the default coefficients, so features
+    that never vary in the recorded timings keep a sensible weight.
+    """
+
+    DEFAULT_COEFFICIENTS = (2.0, 0.01, 0.01, 0.02)
+
+    def __init__(self, coefficients: tuple[float, ...] = DEFAULT_COEFFICIENTS):
+        self.coefficients = coefficients
+
+    def estimate(self, features: CostFeatures) -> float:
+        return max(
+            0.0, sum(c * x for c, x in zip(self.coefficients, features.vector()))
+        )
+
+    @classmethod
+    def fit(
+        cls, samples: list[tuple[CostFeatures, float]], regularization: float = 1.0
+    ) -> "CostModel":
+        prior = cls.DEFAULT_COEFFICIENTS
+        size = len(prior)
+        # Solve (X'X + lambda I) b = X'y + lambda b0
+        lhs = [
+            [regularization if i == j else 0.0 for j in range(size)]
+            for i in range(size)
+        ]
+        rhs = [regularization * c for c in prior]
+        for features, seconds in samples:
+            x = features.vector()
+            for i in range(size):
+                rhs[i] += x[i] * seconds
+                for j in range(size):
+                    lhs[i][j] += x[i] * x[j]
+        return cls(tuple(_solve(lhs, rhs)))
+
+
+def _solve(lhs: list[list[float]], rhs: list[float]) -> list[float]:
+    """Gaussian elimination with partial pivoting."""
+    size = len(rhs)
+    rows = [row[:] + [value] for row, value in zip(lhs, rhs)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(col + 1, size):
+            factor = rows[r][col] / rows[col][col]
+            for c in range(col, size + 1):
+                rows[r][c] -= factor * rows[col][c]
+    solution = [0.0] * size
+    for r in reversed(range(size)):
+        known = sum(rows[r][c] * solution[c] for c in range(r + 1, size))
+        solution[r] = (rows[r][size] - known) / rows[r][r]
+    return solution
+
+
+class TimingStore:
+    """Most recent job run times, recorded by the workers in Redis."""
+
+    def __init__(
+        self,
+        connection_config: RedisConnectionConfig,
+        key_prefix: str,
+        max_samples: int,
+    ):
+        self._redis = make_redis_client(connection_config)
+        self._key = f"{key_prefix}:timings"
+        self._max_samples = max_samples
+
+    def record(self, features: CostFeatures, seconds: float) -> None:
+        sample = json.dumps(
+            {"features": dataclasses.asdict(features), "seconds": seconds}
+        )
+        self._redis.lpush(self._key, sample)
+        self._redis.ltrim(self._key, 0, self._max_samples - 1)
+
+    def load(self) -> list[tuple[CostFeatures, float]]:
+        samples = [json.loads(s) for s in self._redis.lrange(self._key, 0, -1)]
+        return [(CostFeatures(**s["features"]), s["seconds"]) for s in samples]
+
+
+@dataclasses.dataclass(frozen=True)
+class Route:
+    queue: str
+    priority: int
+    estimated_seconds: float
+
+
+class QueueRouter:
+    def __init__(
+        self,
+        timing_store: TimingStore,
+        input_files_dir: Path,
+        fast_queue: str,
+        slow_queue: str,
+        fast_queue_max_seconds: float,
+        calibration_interval_seconds: float,
+    ):
+        self._timing_store = timing_store
+        self._input_files_dir = input_files_dir
+        self._fast_queue = fast_queue
+        self._slow_queue = slow_queue
+        self._fast_queue_max_seconds = fast_queue_max_seconds
+        self._calibration_interval_seconds = calibration_interval_seconds
+        self._calibrated_at: Optional[float] = None
+        self.cost_model = CostModel()
+
+    def route(self, scenario: StormwaterScenario) -> Route:
+        self._calibrate_if_stale()
+        estimate = self.cost_model.estimate(
+            scenario_features(scenario, self._input_files_dir)
+        )
+        queue = (
+            self._fast_queue
+            if estimate <= self._fast_queue_max_seconds
+            else self._slow_queue
+        )
+        # Redis priorities are ascending, 0 is served first.
+        priority = int(
+            MAX_PRIORITY * estimate / (estimate + self._fast_queue_max_seconds)
+        )
+        return Route(queue=queue, priority=priority, estimated_seconds=estimate)
+
+    def _calibrate_if_stale(self) -> None:
+        now = time.monotonic()
+        if (
+            self._calibrated_at is not None
+            and now - self._calibrated_at < self._calibration_interval_seconds
+        ):
+            return
+        self._calibrated_at = now
+
+        try:
+            samples = self._timing_store.load()
+        except redis.RedisError:
+            logger.warning("Could not load job timings, keeping current cost model.")
+            return
+        if samples:
+            self.cost_model = CostModel.fit(samples)
+            logger.info(
+                f"Calibrated cost model on {len(samples)} timings: {self.cost_model.coefficients}"
+            )
@@ -0,0 +1,11 @@
+"""Signatures of the worker tasks.
+
+The API enqueues tasks by name through these, so it never imports
+`stormwater_api.tasks` and with it the simulation stack (pandas, swmmio,
+swmm-toolkit), which only the workers need.
+"""
+from stormwater_api.dependencies import celery_app
+
+COMPUTE_TASK = "stormwater_api.tasks.compute_task"
+
+compute_task = celery_app.signature(COMPUTE_TASK)
@@ -1,39 +1,55 @@
-from pathlib import Path
+import time
 
 from celery import signals
+from celery.utils.imports import symbol_by_name
 from celery.utils.log import get_task_logger
 
-from stormwater_api.dependencies import cache, celery_app
+from stormwater_api.cache import job_key
+from stormwater_api.config import INPUT_DIR, OUTPUT_DIR, RAIN_DATA_DIR, settings
+from stormwater_api.dependencies import cache, celery_app, timing_store
 from stormwater_api.models.calculation_input import StormwaterCalculationInput
-from stormwater_api.processor import ScenarioProcessor
+from stormwater_api.routing import scenario_features
+from stormwater_api.task_signatures import COMPUTE_TASK
 
 logger = get_task_logger(__name__)
 
-DATA_DIR = Path(__file__).parent / "data"
-INPUT_DIR = DATA_DIR / "input_files"
-OUTPUT_DIR = DATA_DIR / "output"
-RAIN_DATA_DIR = DATA_DIR / "rain_data"
+_task_started_at: dict[str, float] = {}
 
+ScenarioProcessor = symbol_by_name(settings.scenario_processor)
 
-@celery_app.task()
-def compute_task(task_def: StormwaterCalculationInput) -> dict:
-    return ScenarioProcessor(
+
+@celery_app.task(name=COMPUTE_TASK, bind=True)
+def compute_task(self, task_def: StormwaterCalculationInput) -> dict:
+    result = ScenarioProcessor(
         task_definition=StormwaterCalculationInput(**task_def),
         base_output_dir=OUTPUT_DIR,
         input_files_dir=INPUT_DIR,
         rain_data_dir=RAIN_DATA_DIR,
+        processes=settings.simulation_processes,
+        timeout_seconds=settings.simulation_timeout_seconds,
     ).perform_swmm_analysis()
+    result["job_id"] = self.request.id
+
+    key = task_def["celery_key"]
+    cache.put(key=key, value=result)
+    cache.put(key=job_key(self.request.id), value={"celery_key": key})
+    logger.info(f"Saved result with key {key} to cache.")
+
+    # The result backend only keeps a reference, the payload lives in the cache tiers.
+    return {"celery_key": key}
+
+
+@signals.task_prerun.connect
+def task_prerun_handler(task_id, task, *args, **kwargs):
+    _task_started_at[task_id] = time.monotonic()
 
 
 @signals.task_postrun.connect
 def task_postrun_handler(task_id, task, *args, **kwargs):
     state = kwargs.get("state")
     args = kwargs.get("args")[0]
-    result = kwargs.get("retval")
-
-    result["job_id"] = task_id
+    duration = time.monotonic() - _task_started_at.pop(task_id)
 
     if state == "SUCCESS":
-        key = args["celery_key"]
-        cache.put(key=key, value=result)
-        logger.info(f"Saved result with key {key} to cache.")
+        features = scenario_features(StormwaterCalculationInput(**args), INPUT_DIR)
+        timing_store.record(features, duration)
@@ -2,6 +2,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 from stormwater_api.api.main import app
+from tests.fakes import FakeRedis, FakeRedisServer
 
 
 @pytest.fixture
@@ -22,7 +23,19 @@ class MockCache:
     def delete(self, *args, **kwargs):
         ...
 
+    def stats(self):
+        return {}
+
 
 @pytest.fixture(autouse=True)
 def mock_cache(monkeypatch):
     monkeypatch.setattr("stormwater_api.api.endpoints.cache", MockCache())
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    server = FakeRedisServer()
+    monkeypatch.setattr(
+        "stormwater_api.cache.redis.Redis", lambda **kwargs: FakeRedis(server)
+    )
+    yield server
@@ -0,0 +1,6 @@
+from benchmarks.fakes import (  # noqa: F401
+    FakePubSub,
+    FakeRedis,
+    FakeRedisServer,
+    wait_for,
+)
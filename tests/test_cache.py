@@ -0,0 +1,253 @@
+import json
+import time
+import zlib
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from stormwater_api.api.main import app
+from stormwater_api.cache import Cache, LocalCache, job_key
+from stormwater_api.cold_storage import ColdStore
+from stormwater_api.config import settings
+from stormwater_api.models.calculation_input import StormwaterCalculationInput
+from tests.fakes import FakeRedis, FakeRedisServer, wait_for
+
+
+def make_cache(max_bytes: int = 1024, ttl_seconds: int = 60) -> Cache:
+    cache = Cache(
+        connection_config=settings.cache.connection,
+        key_prefix="test",
+        ttl_days=1,
+        local_cache=LocalCache(max_bytes=max_bytes, ttl_seconds=ttl_seconds),
+    )
+    cache.start_invalidation_listener()
+    assert wait_for(lambda: cache.stats()["local_cache_enabled"])
+    return cache
+
+
+def test_local_cache_evicts_least_recently_used_by_size():
+    local = LocalCache(max_bytes=10, ttl_seconds=60)
+    local.put("a", {"v": 1}, 4)
+    local.put("b", {"v": 2}, 4)
+    assert local.get("a") == {"v": 1}
+
+    local.put("c", {"v": 3}, 4)
+
+    assert local.get("b") is None
+    assert local.get("a") == {"v": 1}
+    assert local.get("c") == {"v": 3}
+    assert local.size_bytes == 8
+    assert local.stats.evictions == 1
+
+
+def test_local_cache_expires_entries():
+    local = LocalCache(max_bytes=10, ttl_seconds=0)
+    local.put("a", {"v": 1}, 4)
+    time.sleep(0.01)
+    assert local.get("a") is None
+    assert local.size_bytes == 0
+
+
+def test_local_cache_skips_oversized_values():
+    local = LocalCache(max_bytes=10, ttl_seconds=60)
+    local.put("a", {"v": 1}, 11)
+    assert local.get("a") is None
+
+
+def test_local_cache_skips_values_read_before_an_invalidation():
+    local = LocalCache(max_bytes=10, ttl_seconds=60)
+    version = local.version()
+    local.delete("a")
+
+    local.put("a", {"v": 1}, 4, version)
+    assert local.get("a") is None
+
+    local.put("a", {"v": 2}, 4, local.version())
+    assert local.get("a") == {"v": 2}
+
+
+def test_cache_does_not_keep_values_invalidated_during_a_read(redis_server):
+    api_cache = make_cache()
+    worker_cache = make_cache()
+    worker_cache.put(key="key", value={"job_id": "1"})
+    redis_get = api_cache._redis.get
+
+    def get_racing_with_write(name):
+        stale_value = redis_get(name)
+        version = api_cache._local.version()
+        worker_cache.put(key="key", value={"job_id": "2"})
+        assert wait_for(lambda: api_cache._local.version().sequence > version.sequence)
+        return stale_value
+
+    api_cache._redis.get = get_racing_with_write
+    assert api_cache.get(key="key") == {"job_id": "1"}
+    api_cache._redis.get = redis_get
+
+    assert api_cache.get(key="key") == {"job_id": "2"}
+
+
+def test_cache_serves_repeated_reads_from_local_layer(redis_server):
+    cache = make_cache()
+    cache.put(key="key", value={"job_id": "1"})
+
+    assert cache.get(key="key") == {"job_id": "1"}
+    assert cache.get(key="key") == {"job_id": "1"}
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_cache_invalidates_other_processes_on_write(redis_server):
+    api_cache = make_cache()
+    worker_cache = make_cache()
+    worker_cache.put(key="key", value={"job_id": "1"})
+    assert api_cache.get(key="key") == {"job_id": "1"}
+
+    worker_cache.put(key="key", value={"job_id": "2"})
+
+    assert wait_for(lambda: api_cache.get(key="key") == {"job_id": "2"})
+
+    worker_cache.delete(key="key")
+
+    assert wait_for(lambda: api_cache.get(key="key") is None)
+
+
+def test_results_are_served_from_local_layer(redis_server, monkeypatch):
+    cache = make_cache(max_bytes=1024**2)
+    monkeypatch.setattr("stormwater_api.api.endpoints.cache", cache)
+    result = {"job_id": "job", "rain": [], "geojson": {"features": []}}
+    cache.put(key="scenario", value=result)
+    cache.put(key=job_key("job"), value={"celery_key": "scenario"})
+    client = TestClient(app)
+
+    for _ in range(2):
+        assert client.get("/stormwater/jobs/job/status").json() == {"status": "SUCCESS"}
+        assert client.get("/stormwater/jobs/job/results").json() == {"result": result}
+
+    # Status polls resolve the result too, so they see evictions.
+    stats = cache.stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] == 6
+
+
+def fake_result_backend(monkeypatch, results: dict):
+    class FakeAsyncResult:
+        def __init__(self, job_id, app):
+            self.id = job_id
+            self.state = "SUCCESS" if job_id in results else "PENDING"
+
+        def successful(self):
+            return self.state == "SUCCESS"
+
+        def get(self):
+            return results[self.id]
+
+    monkeypatch.setattr("stormwater_api.api.endpoints.AsyncResult", FakeAsyncResult)
+
+
+def test_results_of_jobs_without_reference_fall_back_to_backend(
+    redis_server, monkeypatch
+):
+    cache = make_cache(max_bytes=1024**2)
+    monkeypatch.setattr("stormwater_api.api.endpoints.cache", cache)
+    legacy_result = {"job_id": "legacy", "rain": [], "geojson": {"features": []}}
+    cache.put(key="scenario", value={**legacy_result, "job_id": "new"})
+    fake_result_backend(
+        monkeypatch, {"legacy": legacy_result, "new": {"celery_key": "scenario"}}
+    )
+    client = TestClient(app)
+
+    assert client.get("/stormwater/jobs/legacy/results").json() == {
+        "result": legacy_result
+    }
+    assert client.get("/stormwater/jobs/new/results").json()["result"]["job_id"] == (
+        "new"
+    )
+    assert client.get("/stormwater/jobs/unknown/status").json() == {"status": "PENDING"}
+
+
+def test_cache_hit_references_the_job(redis_server, monkeypatch):
+    cache = make_cache(max_bytes=1024**2)
+    monkeypatch.setattr("stormwater_api.api.endpoints.cache", cache)
+    with open(Path(__file__).parent / "test_cases" / "test_case_1.json") as file:
+        request = json.load(file)["request"]
+    key = StormwaterCalculationInput(**request).celery_key
+    cache.put(key=key, value={"job_id": "legacy"})
+
+    response = TestClient(app).post(
+        "/stormwater/processes/runoff/execution", json=request
+    )
+
+    assert response.json() == {"job_id": "legacy"}
+    assert cache.get(key=job_key("legacy")) == {"celery_key": key}
+
+
+def test_evicted_results_are_reported_as_expired(redis_server, monkeypatch):
+    cache = make_cache(max_bytes=1024**2)
+    monkeypatch.setattr("stormwater_api.api.endpoints.cache", cache)
+    fake_result_backend(monkeypatch, {})
+    cache.put(key=job_key("job"), value={"celery_key": "evicted"})
+    client = TestClient(app)
+
+    assert client.get("/stormwater/jobs/job/status").json() == {"status": "EXPIRED"}
+    assert cache.get(key=job_key("job")) is None
+    assert client.get("/stormwater/jobs/job/results").json() == {
+        "job_id": "job",
+        "job_state": "PENDING",
+    }
+
+
+def test_cache_bypasses_local_layer_without_listener(redis_server):
+    cache = Cache(
+        connection_config=settings.cache.connection,
+        key_prefix="test",
+        ttl_days=1,
+        local_cache=LocalCache(max_bytes=1024, ttl_seconds=60),
+    )
+    cache.put(key="key", value={"job_id": "1"})
+    redis_server.data["test:key"] = ('{"job_id": "2"}', None)
+
+    assert cache.get(key="key") == {"job_id": "2"}
+    assert cache.stats()["local_cache_enabled"] is False
+
+
+def test_cache_promotes_results_from_cold_storage(redis_server):
+    cold_server = FakeRedisServer()
+    cold_store = ColdStore(
+        client=FakeRedis(cold_server), key_prefix="cold", retention_days=1
+    )
+    cache = Cache(
+        connection_config=settings.cache.connection,
+        key_prefix="test",
+        ttl_days=1,
+        cold_store=cold_store,
+    )
+    cache.put(key="key", value={"job_id": "1"})
+    # Simulate the result expiring from Redis.
+    redis_server.data.clear()
+
+    assert cache.get(key="key") == {"job_id": "1"}
+    assert "test:key" in redis_server.data
+
+    cache.delete(key="key")
+
+    assert cold_store.get("key") is None
+    assert cache.get(key="key") is None
+
+
+def test_cold_store_keeps_compressed_results_for_retention_period():
+    cold_server = FakeRedisServer()
+    cold_store = ColdStore(
+        client=FakeRedis(cold_server), key_prefix="cold", retention_days=2
+    )
+    value = json.dumps({"runoff": list(range(100))})
+
+    cold_store.put("key", value)
+
+    compressed_value, expires_at = cold_server.data["cold:key"]
+    assert zlib.decompress(compressed_value).decode() == value
+    assert len(compressed_value) < len(value)
+    assert expires_at == pytest.approx(time.time() + 2 * 86400, abs=60)
+    assert cold_store.get("key") == value
@@ -0,0 +1,106 @@
+import json
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from stormwater_api.models.calculation_input import StormwaterCalculationInput
+
+TEST_CASE = Path(__file__).parent / "test_cases" / "test_case_1.json"
+
+
+@pytest.fixture
+def calculation_input() -> dict:
+    with open(TEST_CASE) as file:
+        return json.load(file)["request"]
+
+
+def test_valid_input_passes(calculation_input):
+    StormwaterCalculationInput(**calculation_input)
+
+
+@pytest.mark.parametrize(
+    "update, message",
+    [
+        (
+            {"subcatchment_id": "Sub999", "outlet_id": "outfall1"},
+            "Unknown subcatchment_id: Sub999",
+        ),
+        (
+            {"subcatchment_id": "Sub003", "outlet_id": "outfall9"},
+            "Unknown outlet_id: outfall9",
+        ),
+    ],
+)
+def test_unknown_model_update_ids_are_rejected(calculation_input, update, message):
+    calculation_input["model_updates"] = [update]
+
+    with pytest.raises(ValidationError, match=message):
+        StormwaterCalculationInput(**calculation_input)
+
+
+def test_subcatchment_may_drain_onto_another_subcatchment(calculation_input):
+    calculation_input["model_updates"] = [
+        {"subcatchment_id": "Sub003", "outlet_id": "Sub399"}
+    ]
+
+    StormwaterCalculationInput(**calculation_input)
+
+
+def test_unknown_geojson_subcatchments_are_rejected(calculation_input):
+    feature = calculation_input["subcatchments"]["features"][0]
+    feature["properties"]["name_sub"] = "Sub999"
+
+    with pytest.raises(ValidationError, match="Unknown name_sub: Sub999"):
+        StormwaterCalculationInput(**calculation_input)
+
+
+@pytest.mark.parametrize(
+    "features, message",
+    [
+        ("x", "subcatchments.features must be a list"),
+        (["x"], "Each feature must be an object"),
+        ([{"properties": ["x"]}], "Feature properties must be an object"),
+        ([{"properties": {"name_sub": 72}}], "name_sub must be a string, got: 72"),
+    ],
+)
+def test_malformed_geojson_subcatchments_are_rejected(
+    calculation_input, features, message
+):
+    calculation_input["subcatchments"] = {"features": features}
+
+    with pytest.raises(ValidationError, match=message):
+        StormwaterCalculationInput(**calculation_input)
+
+
+@pytest.mark.parametrize(
+    "subcatchments",
+    [{"features": ["x"]}, {"features": [{"properties": {"name_sub": 72}}]}],
+)
+def test_malformed_geojson_is_a_client_error(
+    unauthorized_api_test_client, calculation_input, subcatchments
+):
+    calculation_input["subcatchments"] = subcatchments
+
+    with unauthorized_api_test_client as client:
+        response = client.post(
+            "/stormwater/processes/runoff/execution", json=calculation_input
+        )
+
+    assert response.status_code == 400
+
+
+def test_invalid_updates_are_rejected_before_enqueueing(
+    unauthorized_api_test_client, calculation_input
+):
+    calculation_input["model_updates"] = [
+        {"subcatchment_id": "Sub999", "outlet_id": "outfall1"}
+    ]
+
+    with unauthorized_api_test_client as client:
+        response = client.post(
+            "/stormwater/processes/runoff/execution", json=calculation_input
+        )
+
+    assert response.status_code == 400
+    assert response.json()["message"] == "invalid input payload"
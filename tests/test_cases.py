@@ -25,6 +25,12 @@ def wait_for_job_completion(client, endpoint, total_timeout=300):
             print(f"Job status: {status}")
 
 
+@pytest.fixture(autouse=True)
+def mock_cache():
+    # Results are served from the cache, so the end-to-end tests need the real one.
+    ...
+
+
 def load_test_cases(directory: Path) -> list[dict]:
 
     json_data_list = []
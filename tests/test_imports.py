@@ -0,0 +1,10 @@
+from benchmarks.import_time import measure
+
+SIMULATION_STACK = {"pandas", "numpy", "swmmio", "swmm", "networkx"}
+
+
+def test_api_does_not_import_simulation_stack():
+    _, _, imports = measure("stormwater_api.api.main")
+
+    imported = {name.split(".")[0] for _, name in imports}
+    assert imported.isdisjoint(SIMULATION_STACK)
@@ -0,0 +1,39 @@
+import json
+import subprocess
+import sys
+
+
+def test_load_test_harness_runs_in_process():
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.load_test",
+            "--scenarios=30",
+            "--concurrency=5",
+            "--service-time=0.01",
+            "--jitter=0",
+            "--json",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=120,
+    )
+    # The API and the worker log to stdout as well.
+    (report,) = [
+        json.loads(line)
+        for line in completed.stdout.splitlines()
+        if line.startswith('{"elapsed_seconds"')
+    ]
+
+    latencies = report["latency_ms"]
+    assert latencies["submit"]["count"] == 30
+    assert latencies["results"]["count"] == 30
+    assert latencies["status"]["count"] >= 30
+    assert latencies["scenario (hit)"]["count"] > 0
+    assert latencies["scenario (miss)"]["count"] > 0
+    assert (
+        sum(v["count"] for k, v in latencies.items() if k.startswith("scenario")) == 30
+    )
+    assert report["scenarios_per_second"] > 0
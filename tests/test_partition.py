@@ -0,0 +1,347 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from stormwater_api import inp
+from stormwater_api.config import INPUT_DIR, RAIN_DATA_DIR
+from stormwater_api.models.calculation_input import StormwaterCalculationInput
+from stormwater_api.partition import (
+    find_subnetworks,
+    solve_partitioned,
+    write_partitions,
+)
+from stormwater_api.processor import ScenarioProcessor
+
+TEST_CASE = Path(__file__).parent / "test_cases" / "test_case_1.json"
+
+NETWORK = """
+[SUBCATCHMENTS]
+;;Name Rain Gage Outlet Area %Imperv Width %Slope CurbLen
+S1     RG1       J1     1    50      10    1      0
+S2     RG1       S1     1    50      10    1      0
+S3     RG1       J3     1    50      10    1      0
+S4     RG1       O1     1    50      10    1      0
+
+[JUNCTIONS]
+J1 0 1 0 0 0
+J2 0 1 0 0 0
+J3 0 1 0 0 0
+
+[OUTFALLS]
+O1 0 FREE NO
+O2 0 FIXED 1 NO
+
+[CONDUITS]
+C1 J1 J2 10 0.01 0 0 0 0
+C2 J2 O1 10 0.01 0 0 0 0
+C3 J3 O2 10 0.01 0 0 0 0
+
+[XSECTIONS]
+C1 CIRCULAR 1 0 0 0 1
+C2 CIRCULAR 1 0 0 0 1
+C3 CIRCULAR 1 0 0 0 1
+"""
+
+# Two flow dividers at the same elevation, each diverting into its own conduit.
+DIVIDED_NETWORK = """
+[SUBCATCHMENTS]
+S1 RG1 D1 1 50 10 1 0
+S2 RG1 D2 1 50 10 1 0
+
+[DIVIDERS]
+;;Name Elev DivLink DivType Ymax Y0 Ysur Apond
+D1     0    C2      OVERFLOW 0   0  0    0
+D2     0    C4      OVERFLOW 0   0  0    0
+
+[OUTFALLS]
+O1 0 FREE NO
+O2 0 FREE NO
+
+[CONDUITS]
+C1 D1 O1 10 0.01 0 0 0 0
+C2 D1 O1 10 0.01 0 0 0 0
+C3 D2 O2 10 0.01 0 0 0 0
+C4 D2 O2 10 0.01 0 0 0 0
+
+[XSECTIONS]
+C1 CIRCULAR 1 0 0 0 1
+C2 CIRCULAR 1 0 0 0 1
+C3 CIRCULAR 1 0 0 0 1
+C4 CIRCULAR 1 0 0 0 1
+"""
+
+# Sections that turn NETWORK into a model SWMM can solve.
+SIMULATION = """
+[OPTIONS]
+FLOW_UNITS CMS
+START_DATE 01/01/2020
+START_TIME 00:00:00
+REPORT_START_DATE 01/01/2020
+REPORT_START_TIME 00:00:00
+END_DATE 01/01/2020
+END_TIME 02:00:00
+REPORT_STEP 00:05:00
+
+[RAINGAGES]
+RG1 INTENSITY 0:30 1.0 TIMESERIES TS1
+
+[TIMESERIES]
+TS1 0:00 0
+TS1 0:30 20
+TS1 1:00 0
+
+[SUBAREAS]
+S1 0.01 0.1 0.05 0.05 25 OUTLET
+S2 0.01 0.1 0.05 0.05 25 OUTLET
+S3 0.01 0.1 0.05 0.05 25 OUTLET
+S4 0.01 0.1 0.05 0.05 25 OUTLET
+
+[INFILTRATION]
+S1 3 0.5 4 7 0
+S2 3 0.5 4 7 0
+S3 3 0.5 4 7 0
+S4 3 0.5 4 7 0
+"""
+
+# S3 drains to J3, but its groundwater flows to J1.
+GROUNDWATER = """
+[AQUIFERS]
+A1 0.5 0.15 0.30 0.1 5 10 0.0 0.0 0 0 1 0.2
+
+[GROUNDWATER]
+S3 A1 J1 2 0.001 1 0 0 0 0 1
+"""
+
+# A rule acting on C1 depending on J3.
+CONTROLS = """
+[CONTROLS]
+RULE R1
+IF NODE J3 DEPTH > 0.5
+THEN CONDUIT C1 STATUS = CLOSED
+PRIORITY 1
+"""
+
+
+@pytest.fixture
+def network_path(tmp_path) -> Path:
+    path = tmp_path / "network.inp"
+    path.write_text(NETWORK)
+    return path
+
+
+def test_subnetworks_are_split_at_outfalls(network_path):
+    subnetworks = find_subnetworks(inp.read_sections(network_path))
+
+    assert sorted(sorted(s.elements) for s in subnetworks) == [
+        ["C1", "C2", "J1", "J2", "O1", "S1", "S2"],
+        ["C3", "J3", "O2", "S3"],
+        ["O1", "S4"],
+    ]
+
+
+def test_partitions_only_contain_their_elements(network_path, tmp_path):
+    paths = write_partitions(network_path, tmp_path, max_partitions=2)
+
+    partitions = [inp.read_sections(path) for path in paths]
+    subcatchments = [inp.element_ids(p, "SUBCATCHMENTS") for p in partitions]
+    assert sorted(sorted(s) for s in subcatchments) == [["S1", "S2"], ["S3", "S4"]]
+    for sections in partitions:
+        conduits = set(inp.element_ids(sections, "CONDUITS"))
+        assert set(inp.element_ids(sections, "XSECTIONS")) == conduits
+
+
+def test_dividers_only_join_their_own_links(tmp_path):
+    path = tmp_path / "network.inp"
+    path.write_text(DIVIDED_NETWORK)
+
+    subnetworks = find_subnetworks(inp.read_sections(path))
+
+    assert sorted(sorted(s.elements) for s in subnetworks) == [
+        ["C1", "C2", "D1", "O1", "S1"],
+        ["C3", "C4", "D2", "O2", "S2"],
+    ]
+
+
+@pytest.fixture(params=[GROUNDWATER, CONTROLS], ids=["groundwater", "controls"])
+def cross_referenced_network_path(tmp_path, request) -> Path:
+    path = tmp_path / "network.inp"
+    path.write_text(NETWORK + SIMULATION + request.param)
+    return path
+
+
+def test_cross_referenced_elements_stay_together(cross_referenced_network_path):
+    subnetworks = find_subnetworks(inp.read_sections(cross_referenced_network_path))
+
+    assert sorted(sorted(s.elements) for s in subnetworks) == [
+        ["C1", "C2", "C3", "J1", "J2", "J3", "O1", "O2", "S1", "S2", "S3"],
+        ["O1", "S4"],
+    ]
+
+
+def test_partitions_of_cross_referenced_network_solve(
+    cross_referenced_network_path, tmp_path
+):
+    output_paths = solve_partitioned(
+        cross_referenced_network_path, tmp_path, max_partitions=2, timeout_seconds=60
+    )
+
+    assert len(output_paths) == 2
+    sections = [
+        inp.read_sections(Path(path).with_suffix(".inp")) for path in output_paths
+    ]
+    # The rows referencing other elements are kept by exactly one partition.
+    source = inp.read_sections(cross_referenced_network_path)
+    for section in ["GROUNDWATER", "CONTROLS"]:
+        holders = [s for s in sections if s.get(section)]
+        assert len(holders) == (section in source)
+
+
+HANGING_SOLVER = "import time; time.sleep(60)"
+FAILING_SOLVER = "exit('no solution')"
+
+
+@pytest.fixture
+def replace_solvers(monkeypatch):
+    """Run the given scripts instead of the partition solvers, in order."""
+    popen = subprocess.Popen
+
+    def replace(*scripts: str) -> list[subprocess.Popen]:
+        started = []
+
+        def start_solver(args, **kwargs):
+            process = popen([sys.executable, "-c", scripts[len(started)]], **kwargs)
+            started.append(process)
+            return process
+
+        monkeypatch.setattr(subprocess, "Popen", start_solver)
+        return started
+
+    return replace
+
+
+def test_failing_partition_kills_remaining_solvers(
+    network_path, tmp_path, replace_solvers
+):
+    solvers = replace_solvers(FAILING_SOLVER, HANGING_SOLVER)
+
+    with pytest.raises(RuntimeError, match="no solution"):
+        solve_partitioned(network_path, tmp_path, max_partitions=2, timeout_seconds=60)
+
+    assert len(solvers) == 2
+    assert all(process.returncode is not None for process in solvers)
+
+
+def test_solving_partitions_times_out(network_path, tmp_path, replace_solvers):
+    solvers = replace_solvers(HANGING_SOLVER, HANGING_SOLVER)
+
+    with pytest.raises(RuntimeError, match="longer than 0.5s"):
+        solve_partitioned(network_path, tmp_path, max_partitions=2, timeout_seconds=0.5)
+
+    assert len(solvers) == 2
+    assert all(process.returncode is not None for process in solvers)
+
+
+def run_scenario(
+    tmp_path: Path, processes: int, extra_features: tuple[dict, ...] = ()
+) -> dict:
+    with open(TEST_CASE) as file:
+        request = json.load(file)["request"]
+    request["model_updates"].append(
+        {"subcatchment_id": "Sub010", "outlet_id": "Sub399"}
+    )
+    request["subcatchments"]["features"] += extra_features
+
+    return ScenarioProcessor(
+        task_definition=StormwaterCalculationInput(**request),
+        base_output_dir=tmp_path / f"processes_{processes}",
+        input_files_dir=INPUT_DIR,
+        rain_data_dir=RAIN_DATA_DIR,
+        processes=processes,
+    ).perform_swmm_analysis()
+
+
+def test_partitioned_run_matches_monolithic_run(tmp_path):
+    monolithic = run_scenario(tmp_path, processes=1)
+    partitioned = run_scenario(tmp_path, processes=4)
+
+    assert partitioned["rain"] == monolithic["rain"]
+    features = zip(
+        monolithic["geojson"]["features"], partitioned["geojson"]["features"]
+    )
+    for expected, actual in features:
+        expected_results = expected["properties"]["runoff_results"]
+        actual_results = actual["properties"]["runoff_results"]
+        assert actual_results["timestamps"] == expected_results["timestamps"]
+        assert actual_results["runoff_value"] == pytest.approx(
+            expected_results["runoff_value"]
+        )
+
+
+def test_features_without_properties_are_passed_through(tmp_path):
+    unnamed_features = (
+        {"type": "Feature", "geometry": None},
+        {"type": "Feature", "geometry": None, "properties": None},
+    )
+
+    result = run_scenario(tmp_path, processes=4, extra_features=unnamed_features)
+
+    assert result["geojson"]["features"][-2:] == list(unnamed_features)
+    assert all(
+        "runoff_results" in feature["properties"]
+        for feature in result["geojson"]["features"][:-2]
+    )
+
+
+def test_compute_task_runs_partitioned_in_prefork_worker(
+    monkeypatch, redis_server, tmp_path
+):
+    from celery.contrib.testing.worker import start_worker
+
+    import stormwater_api.tasks as tasks
+    from stormwater_api.config import settings
+    from stormwater_api.dependencies import celery_app
+    from stormwater_api.routing import TimingStore
+
+    with open(TEST_CASE) as file:
+        request = json.load(file)["request"]
+    calculation_input = StormwaterCalculationInput(**request)
+
+    # Prefork children are daemonic and may not start processes of their own.
+    monkeypatch.setattr(settings, "simulation_processes", 2)
+    monkeypatch.setattr(tasks, "OUTPUT_DIR", tmp_path / "output")
+
+    class FileCache:
+        """Records what the worker caches where this process can see it."""
+
+        def put(self, *, key: str, value: dict) -> None:
+            (tmp_path / f"{key}.json").write_text(json.dumps(value))
+
+    monkeypatch.setattr(tasks, "cache", FileCache())
+    monkeypatch.setattr(
+        tasks,
+        "timing_store",
+        TimingStore(
+            connection_config=settings.cache.connection,
+            key_prefix="test",
+            max_samples=1,
+        ),
+    )
+    monkeypatch.delenv("CELERY_BROKER_URL", raising=False)
+    monkeypatch.delenv("CELERY_RESULT_BACKEND", raising=False)
+    monkeypatch.setattr(celery_app.conf, "broker_url", "memory://")
+    monkeypatch.setattr(celery_app.conf, "result_backend", f"file://{tmp_path}")
+
+    with start_worker(
+        celery_app, concurrency=1, pool="prefork", perform_ping_check=False
+    ):
+        result = tasks.compute_task.delay(jsonable_encoder(calculation_input))
+        key = calculation_input.celery_key
+        assert result.get(timeout=60) == {"celery_key": key}
+
+    stored = json.loads((tmp_path / f"{key}.json").read_text())
+    assert stored["job_id"] == result.id
+    assert stored["geojson"]["features"]
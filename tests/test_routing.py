@@ -0,0 +1,203 @@
+import heapq
+import random
+from dataclasses import dataclass
+
+from stormwater_api.config import INPUT_DIR, settings
+from stormwater_api.models.calculation_input import ModelUpdate, StormwaterScenario
+from stormwater_api.network_index import get_network_index
+from stormwater_api.routing import (
+    CostFeatures,
+    CostModel,
+    QueueRouter,
+    TimingStore,
+    scenario_features,
+)
+
+FAST_QUEUE = "fast"
+SLOW_QUEUE = "slow"
+
+
+def make_scenario(return_period: int, update_count: int = 0) -> StormwaterScenario:
+    subcatchment_ids = sorted(
+        get_network_index(f"blockToPark_extensive_{return_period}.inp").subcatchments
+    )
+    return StormwaterScenario(
+        return_period=return_period,
+        flow_path="blockToPark",
+        roofs="extensive",
+        model_updates=[
+            ModelUpdate(outlet_id="outfall1", subcatchment_id=subcatchment_id)
+            for subcatchment_id in subcatchment_ids[:update_count]
+        ],
+    )
+
+
+def true_cost(features: CostFeatures) -> float:
+    """Synthetic run time the tests calibrate against."""
+    work = features.simulation_minutes * features.subcatchment_count / 1000
+    return (
+        0.5
+        + 0.005 * work * (1 + features.return_period / 20)
+        + 0.05 * features.update_count
+    )
+
+
+def make_router(redis_server, samples: list[StormwaterScenario]) -> QueueRouter:
+    timing_store = TimingStore(
+        connection_config=settings.cache.connection, key_prefix="test", max_samples=100
+    )
+    rng = random.Random(0)
+    for scenario in samples:
+        features = scenario_features(scenario, INPUT_DIR)
+        timing_store.record(features, true_cost(features) * rng.uniform(0.9, 1.1))
+    return QueueRouter(
+        timing_store=timing_store,
+        input_files_dir=INPUT_DIR,
+        fast_queue=FAST_QUEUE,
+        slow_queue=SLOW_QUEUE,
+        fast_queue_max_seconds=5,
+        calibration_interval_seconds=300,
+    )
+
+
+def calibration_samples() -> list[StormwaterScenario]:
+    return [
+        make_scenario(return_period, update_count)
+        for return_period in [2, 10, 100]
+        for update_count in [0, 10, 50, 100, 200]
+    ]
+
+
+def test_scenario_features_read_the_input_file():
+    features = scenario_features(make_scenario(100, 3), INPUT_DIR)
+
+    assert features == CostFeatures(
+        return_period=100,
+        simulation_minutes=240,
+        subcatchment_count=504,
+        update_count=3,
+    )
+
+
+def test_cost_model_fit_recovers_run_times():
+    features = [
+        scenario_features(scenario, INPUT_DIR) for scenario in calibration_samples()
+    ]
+    model = CostModel.fit([(f, true_cost(f)) for f in features])
+
+    for f in features:
+        assert abs(model.estimate(f) - true_cost(f)) < 0.05 * true_cost(f)
+
+
+def test_cost_model_fit_keeps_prior_for_unseen_features():
+    baseline = scenario_features(make_scenario(2), INPUT_DIR)
+    model = CostModel.fit([(baseline, 3.0)] * 10)
+
+    assert model.coefficients[3] == CostModel.DEFAULT_COEFFICIENTS[3]
+
+
+def test_router_sends_expensive_jobs_to_slow_queue(redis_server):
+    router = make_router(redis_server, calibration_samples())
+
+    cheap = router.route(make_scenario(2))
+    expensive = router.route(make_scenario(100, 200))
+
+    assert cheap.queue == FAST_QUEUE
+    assert expensive.queue == SLOW_QUEUE
+    assert cheap.priority < expensive.priority
+
+
+@dataclass
+class Job:
+    arrival: float
+    service: float
+    cheap: bool
+    queue: str = FAST_QUEUE
+    priority: int = 0
+
+
+def simulate(jobs: list[Job], workers: int) -> list[float]:
+    """Latency of each job in a queue served by `workers`, highest priority first."""
+    latencies = [0.0] * len(jobs)
+    order = sorted(range(len(jobs)), key=lambda i: jobs[i].arrival)
+    free_at = [0.0] * workers
+    pending: list[tuple[int, float, int]] = []
+    next_arrival = 0
+
+    while next_arrival < len(order) or pending:
+        worker = min(range(workers), key=lambda w: free_at[w])
+        now = free_at[worker]
+        if not pending and jobs[order[next_arrival]].arrival > now:
+            now = jobs[order[next_arrival]].arrival
+        while next_arrival < len(order) and jobs[order[next_arrival]].arrival <= now:
+            i = order[next_arrival]
+            heapq.heappush(pending, (jobs[i].priority, jobs[i].arrival, i))
+            next_arrival += 1
+
+        _, arrival, i = heapq.heappop(pending)
+        free_at[worker] = now + jobs[i].service
+        latencies[i] = free_at[worker] - arrival
+    return latencies
+
+
+def p95(values: list[float]) -> float:
+    return sorted(values)[int(0.95 * (len(values) - 1))]
+
+
+def test_routing_reduces_tail_latency_of_cheap_jobs(redis_server):
+    router = make_router(redis_server, calibration_samples())
+    rng = random.Random(1)
+
+    # A burst of expensive runs lands just before a steady stream of baseline runs.
+    jobs = []
+    for _ in range(30):
+        scenario = make_scenario(100, rng.randint(100, 200))
+        jobs.append((rng.uniform(0, 5), scenario, False))
+    for i in range(100):
+        scenario = make_scenario(rng.choice([2, 10]))
+        jobs.append((5 + i * 1.0, scenario, True))
+
+    single_queue = []
+    routed = []
+    for arrival, scenario, cheap in jobs:
+        service = true_cost(scenario_features(scenario, INPUT_DIR))
+        route = router.route(scenario)
+        single_queue.append(Job(arrival=arrival, service=service, cheap=cheap))
+        routed.append(
+            Job(
+                arrival=arrival,
+                service=service,
+                cheap=cheap,
+                queue=route.queue,
+                priority=route.priority,
+            )
+        )
+
+    workers = 4
+    single_latencies = simulate(single_queue, workers)
+    fast_jobs = [job for job in routed if job.queue == FAST_QUEUE]
+    slow_jobs = [job for job in routed if job.queue == SLOW_QUEUE]
+    fast_latencies = simulate(fast_jobs, 1)
+    slow_latencies = simulate(slow_jobs, workers - 1)
+
+    assert all(job.cheap for job in fast_jobs)
+    assert not any(job.cheap for job in slow_jobs)
+
+    single_cheap_p95 = p95(
+        [lat for lat, job in zip(single_latencies, single_queue) if job.cheap]
+    )
+    routed_cheap_p95 = p95(fast_latencies)
+    assert routed_cheap_p95 < single_cheap_p95 / 2
+
+    # Reserving capacity must not starve the expensive jobs either.
+    assert max(slow_latencies) < 2 * max(single_latencies)
+
+
+def test_workers_without_queue_selection_consume_routed_queues():
+    from stormwater_api.dependencies import celery_app
+
+    assert {
+        settings.routing.fast_queue,
+        settings.routing.slow_queue,
+        "celery",
+    } <= set(celery_app.amqp.queues)